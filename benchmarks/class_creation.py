@@ -0,0 +1,34 @@
+"""the throughput of creating schemata types.
+
+every subscription, fluent call and operator makes a class through Generic.__new__.
+the arguments change on each round so the intern table can't answer for them.
+
+    python benchmarks/class_creation.py
+"""
+
+import timeit
+
+from schemata import Dict, Enum, Generic, Integer, List, String
+
+CASES = dict(
+    subscription=lambda i: Integer.Minimum[i],
+    fluent=lambda i: Integer.minimum(i).maximum(i + 1),
+    composite=lambda i: Integer.minimum(i) | String,
+    enum=lambda i: Enum[str(i), str(i + 1)],
+    items=lambda i: List[Integer.minimum(i)],
+    properties=lambda i: Dict[{f"a{i}": Integer, "b": String}],
+    add=lambda i: Generic.type((Integer, Generic.Minimum[i])),
+)
+
+
+def main(number=500, repeat=3):
+    count = iter(range(1 << 30))
+    for name, f in CASES.items():
+        best = min(
+            timeit.repeat(lambda: f(next(count)), number=number, repeat=repeat)
+        )
+        print(f"{name:>14} {number / best:10.0f} classes/s")
+
+
+if __name__ == "__main__":
+    main()
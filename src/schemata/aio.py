@@ -0,0 +1,93 @@
+"""asyncio validation and construction that keeps the event loop responsive.
+
+the work runs on an executor in bounded chunks, the loop gets control back between
+chunks. cancelling the task stops after the chunk that is running. a timeout is a
+budget for the whole call, or for each chunk of a stream. portable types, those
+validated by their schema alone, send the raveled schema to the executor so
+process pools work too. other types need a thread pool.
+"""
+
+import asyncio
+import functools
+
+from . import parallel, util
+
+CHUNK = 1 << 12
+_executor = [None]
+
+
+def set_executor(executor):
+    """set the executor used when a call doesn't name one, None is the loop default."""
+    _executor[0] = executor
+
+
+class Budget:
+    # run callables on the executor until the deadline passes
+    def __init__(self, executor=None, timeout=None):
+        # get_running_loop is new in python 3.7, in a coroutine this is the same loop
+        self.loop = asyncio.get_event_loop()
+        self.executor = executor or _executor[0]
+        self.deadline = None if timeout is None else self.loop.time() + timeout
+
+    async def __call__(self, f, *args):
+        remaining = None
+        if self.deadline is not None:
+            remaining = self.deadline - self.loop.time()
+            if remaining <= 0:
+                raise asyncio.TimeoutError
+        future = self.loop.run_in_executor(self.executor, f, *args)
+        return await asyncio.wait_for(future, remaining)
+
+
+async def check(run, schema, items, start=0, chunksize=None):
+    # validate items against a raveled schema a chunk at a time
+    backend = schema.get("backend") or util.get_backend()
+    for i, x in parallel.chunks(items, chunksize or CHUNK):
+        e = await run(parallel.chunk, schema, backend, start + i, x, "raise")
+        if e is not None:
+            raise e
+
+
+async def validate(cls, x, executor=None, timeout=None, chunksize=None):
+    run = Budget(executor, timeout)
+    from .types import List
+
+    p = type.__subclasscheck__(List, cls) and cls.plan()
+    if p and isinstance(x, list) and isinstance(p["items"], dict):
+        # the items in chunks, then the container keywords in one go
+        await check(run, util.Schema.ravel(p["items"]), x, 0, chunksize)
+        s = cls.schema().ravel()
+        s.pop("items", None)
+        await run(util.Schema.validate, s, x)
+        return x
+    if cls.portable():
+        await run(util.Schema.validate, cls.schema().ravel(), x)
+        return x
+    return await run(cls.validate, x)
+
+
+async def object(cls, *args, executor=None, timeout=None, **kwargs):
+    return await Budget(executor, timeout)(functools.partial(cls, *args, **kwargs))
+
+
+async def validate_stream(cls, iterable, executor=None, timeout=None, chunksize=None):
+    # gather chunks from an async iterable and validate each one as it fills
+    n, chunk = 0, []
+    s = cls.schema().ravel() if cls.portable() else None
+
+    async def flush():
+        run = Budget(executor, timeout)
+        if s is not None:
+            await check(run, s, chunk, n, len(chunk))
+            return chunk
+        return await run(cls.validate_many, chunk)
+
+    async for x in iterable:
+        chunk.append(x)
+        if len(chunk) >= (chunksize or CHUNK):
+            for y in await flush():
+                yield y
+            n, chunk = n + len(chunk), []
+    if chunk:
+        for y in await flush():
+            yield y
@@ -101,12 +101,12 @@ class Typer(App["typer.Typer"]):
             n, help = x.__name__, None
             if isinstance(x, base.Generic):
 
-                if issubclass(x, App):
+                if type.__subclasscheck__(App, x):
                     app.add_typer(x)
                     continue
-                elif issubclass(x, cls.Py):
+                elif type.__subclasscheck__(cls.Py, x):
                     y = x
-                    while issubclass(x, cls.Py):
+                    while type.__subclasscheck__(cls.Py, x):
                         u = cls.Value.forms(x)
                         if u:
                             x = u[0]
@@ -7,12 +7,74 @@ actual type implementations, these are composed in the types module
 import abc
 import collections
 import functools
+import hashlib
 import inspect
+import itertools
+import threading
 import typing
+import weakref
 
 from . import exceptions, util
 
 
+def token(x):
+    # a hashable key for a subscription, json values by equality and anything else,
+    # like types and functions, by identity. 1, 1.0 and True stay apart.
+    if isinstance(x, (str, bytes, int, float, type(None))):
+        return type(x), x
+    if isinstance(x, (tuple, list)):
+        return type(x), tuple(map(token, x))
+    if isinstance(x, dict):
+        return type(x), tuple((token(k), token(v)) for k, v in x.items())
+    if isinstance(x, (set, frozenset)):
+        return type(x), frozenset(map(token, x))
+    return id, id(x)
+
+
+class Interned:
+    # a weak valued table of subscribed types, equal subscriptions of a class share
+    # one class object. each class keeps its base and argument alive, so the ids in
+    # its key can't be reused while it is in the table. live counts the dynamic
+    # classes that have not been collected.
+    def __init__(self):
+        self.data, self.lock = weakref.WeakValueDictionary(), threading.RLock()
+        self.refs, self.hits, self.misses = {}, 0, 0
+
+    def get(self, cls, x):
+        with self.lock:
+            t = self.data.get((id(cls), token(x)))
+            if t is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return t
+
+    def add(self, cls, x, t):
+        # only subclasses of cls are interned, they keep cls alive through the mro
+        with self.lock:
+            if any(c is cls for c in getattr(t, "__mro__", ())[1:]):
+                type.__setattr__(t, "_interned", (cls, x))
+                self.data[id(cls), token(x)] = t
+        return t
+
+    def created(self, t):
+        k = id(t)
+        with self.lock:
+            self.refs[k] = weakref.ref(t, lambda _: self.refs.pop(k, None))
+        return t
+
+    def stats(self):
+        return dict(
+            hits=self.hits,
+            misses=self.misses,
+            interned=len(self.data),
+            live=len(self.refs),
+        )
+
+
+interned = Interned()
+
+
 # the Interface represents all of the bespoke type api features we provide through schemata.
 class Interface:
     @abc.abstractclassmethod
@@ -23,6 +85,14 @@ class Interface:
     def validate(cls, *args):  # pragma: no cover
         return cls.schema().validate(*args)
 
+    @abc.abstractclassmethod
+    def is_valid(cls, *args):  # pragma: no cover
+        return cls.schema().checker()(*args)
+
+    @abc.abstractclassmethod
+    def iter_errors(cls, *args, max_errors=None):  # pragma: no cover
+        return cls.schema().iter_errors(*args)
+
     @abc.abstractclassmethod
     def strategy(cls, *args):  # pragma: no cover
         pass
@@ -50,6 +120,32 @@ class Interface:
         return IPython.display.DisplayHandle()
 
 
+class Fluent:
+    # the lowercase builder of a form, Integer.minimum(0) is Integer + Minimum[0].
+    # a non data descriptor on the metaclass, so attributes of the types win. equal
+    # calls on a type return the same interned class.
+    def __init__(self, form):
+        self.form = form
+
+    def __get__(self, cls, meta=None):
+        if cls is None:
+            return self
+        return functools.partial(self.build, cls)
+
+    def build(self, cls, *x):
+        k = Fluent, self.form, x
+        t = interned.get(cls, k)
+        if t is None:
+            t = interned.add(cls, k, cls + getattr(cls, self.form).type(*x))
+        return t
+
+
+# the Interface methods that Generic makes classmethods on every new type
+ABSTRACT = tuple(
+    k for k, v in vars(Interface).items() if isinstance(v, abc.abstractclassmethod)
+)
+
+
 class Generic(Interface, abc.ABCMeta):
     # the generic base case is the metaclass for all of schemata's typess and protocols
     # in this specific definition we only add magic method definitions to the types
@@ -67,8 +163,9 @@ class Generic(Interface, abc.ABCMeta):
         # the annotations are meaningful and obey different semantics.
         p = {}
         try:
-            is_list = any(cls.List in x.__mro__ for x in bases)
-            is_dict = any(cls.Dict in x.__mro__ for x in bases)
+            List, Dict = cls.List, cls.Dict
+            is_list = any(type.__subclasscheck__(List, x) for x in bases)
+            is_dict = any(type.__subclasscheck__(Dict, x) for x in bases)
             if is_list or is_dict:
                 if not (cls.Properties.forms(cls) or cls.Items.forms(cls)):
                     p.update(kwargs.pop(ANNOTATIONS, {}))
@@ -83,11 +180,7 @@ class Generic(Interface, abc.ABCMeta):
         # inheritence confusion.
         kwargs[ANNOTATIONS] = util.Schema(kwargs.get(ANNOTATIONS, {}))
 
-        for k in tuple(
-            k
-            for k, v in vars(Interface).items()
-            if isinstance(v, abc.abstractclassmethod)
-        ):
+        for k in ABSTRACT:
             if k in kwargs:
                 if not isinstance(kwargs[k], classmethod):
                     kwargs[k] = classmethod(kwargs[k])
@@ -109,7 +202,7 @@ class Generic(Interface, abc.ABCMeta):
                                     d[k].add(a)
 
                 else:
-                    if not issubclass(p[k], cls.Default):
+                    if not type.__subclasscheck__(cls.Default, p[k]):
                         r += (k,)
 
             t = (cls.Properties[p],)
@@ -129,11 +222,21 @@ class Generic(Interface, abc.ABCMeta):
         setattr(Generic, cls.__name__, getattr(Generic, cls.__name__, cls))
 
         with util.suppress(AttributeError):
-            cls.__annotations__ = util.Schema.merge(*cls.__mro__)
+            # the bases are merged already, so only they and the new annotations
+            # are merged rather than the whole mro.
+            cls.__annotations__ = util.Schema.merge(cls, *bases)
+        with util.suppress(AttributeError):
+            type.__delattr__(cls, "_fingerprints")
 
         if is_list and t is not None:
             return cls[Generic.type((cls.Dict,) + t)]
 
+        # dict types plan their defaults, and find their cycles, when they are made.
+        # the forms that build Dict itself come first and have no plan.
+        construction = is_dict and getattr(cls, "construction", None)
+        if construction:
+            construction()
+
         with util.suppress(NameError):
             cls.__init_subclass__()
         return cls
@@ -143,7 +246,10 @@ class Generic(Interface, abc.ABCMeta):
         if isinstance(x, slice):
             if x.start is x.stop is x.step is None:
                 return cls
-        return cls.type(x)
+        t = interned.get(cls, x)
+        if t is None:
+            t = interned.add(cls, x, cls.type(x))
+        return t
 
     def __add__(cls, object):
         return Generic.type((cls, object))
@@ -158,30 +264,49 @@ class Generic(Interface, abc.ABCMeta):
         return cls >> cls.Do[object]
 
     def __hash__(cls):
-        return hash(cls.schema().hashable())
+        return hash(cls.fingerprint())
+
+    def fingerprints(cls):
+        # the digest of the raveled schema and the fingerprint of the schema, taken
+        # once per class. the forms that rewrite annotations forget them.
+        f = cls.__dict__.get("_fingerprints")
+        if f is None:
+            s = cls.schema()
+            f = (
+                util.digest(util.Schema.ravel(s)),
+                hashlib.sha1(repr(util.shape(s)).encode("utf-8")).hexdigest(),
+            )
+            type.__setattr__(cls, "_fingerprints", f)
+        return f
+
+    def digest(cls):
+        # the key of the validator caches, shared by every type that ravels alike
+        return cls.fingerprints()[0]
+
+    def fingerprint(cls):
+        # equal schemas have equal fingerprints, unlike the digest the callables
+        # that ravel drops count by identity.
+        return cls.fingerprints()[1]
 
     def __subclasscheck__(cls, x):
         t = type.__subclasscheck__(cls, x)
         if t:
             return True
-        with util.suppress(AttributeError):
+        # otherwise x is a subtype when its schema implies the schema of cls
+        if isinstance(x, Generic):
             a, b = x.schema(), cls.schema()
             if any(a) and any(b):
-                if a in b:
-                    return True
+                from . import subsumption
 
-        return x in cls.mro()
+                return subsumption.issubtype(x, cls)
+        return False
 
     def __instancecheck__(cls, object):
-        try:
-            cls.validate(object)
-            return True
-        except exceptions.ValidationErrors:
-            return False
+        return cls.is_valid(object)
 
     def __eq__(cls, object):
         if isinstance(object, Generic):
-            return cls.schema() == object.schema()
+            return cls is object or cls.fingerprint() == object.fingerprint()
         with util.suppress(AttributeError):
             if cls.Py in cls.__mro__:
                 with util.suppress(IndexError):
@@ -224,8 +349,13 @@ class Generic(Interface, abc.ABCMeta):
     def __getattr__(cls, k):
 
         if k[0].islower():
-            k = k[0].upper() + k[1:]
-            v = object.__getattribute__(cls, k)
+            f = k[0].upper() + k[1:]
+            v = object.__getattribute__(cls, f)
+            if getattr(type(cls), f, None) is v:
+                # forms of the metaclass get a builder on the metaclass, later
+                # lookups of the name don't come back here.
+                setattr(type(cls), k, Fluent(f))
+                return getattr(cls, k)
 
             @functools.wraps(v)
             def call(*x):
@@ -242,6 +372,71 @@ class Generic(Interface, abc.ABCMeta):
     def example(cls):
         return cls.strategy().example()
 
+    def validate_many(cls, iterable, *, errors="raise", executor=None, chunksize=None):
+        """validate many instances, reusing one validator for all of them.
+
+        errors="raise" returns the validated instances and raises the first error,
+        errors="collect" returns the error for each instance, or None when it is
+        valid, and errors="mask" returns a boolean for each instance.
+
+        executor, a process pool or "processes", validates chunks of the instances
+        in worker processes. only types validated by their schema alone go to the
+        workers, their errors have the global index as the first path item."""
+        if errors not in {"raise", "collect", "mask"}:
+            raise ValueError(f"errors must be raise, collect or mask, not {errors}")
+        schema_only = cls.portable()
+        if executor is not None and schema_only:
+            from . import parallel
+
+            return parallel.validate_many(
+                cls.schema(), iterable, errors, executor, chunksize
+            )
+        if schema_only:
+            # types validated by their schema alone skip the classmethod overhead.
+            # the errors are exceptions.Error like the ones from the workers.
+            s = cls.schema()
+            check = s.checker(key=cls.digest())
+            if errors == "mask":
+                return list(map(check, iterable))
+            if errors == "collect":
+                return [
+                    None if check(x) else next(iter(s.iter_errors(x)), None)
+                    for x in iterable
+                ]
+            result = list(iterable)
+            for x in itertools.filterfalse(check, result):
+                for e in s.iter_errors(x):
+                    raise e
+            return result
+
+        return validate_each(cls, iterable, errors)
+
+    async def avalidate(cls, x, *, executor=None, timeout=None, chunksize=None):
+        """validate on an executor without blocking the event loop.
+
+        lists are checked in chunks so cancellation and the timeout, in seconds for
+        the whole call, take effect between chunks."""
+        from . import aio
+
+        return await aio.validate(cls, x, executor, timeout, chunksize)
+
+    async def aobject(cls, *args, executor=None, timeout=None, **kwargs):
+        """construct an instance on an executor without blocking the event loop."""
+        from . import aio
+
+        return await aio.object(
+            cls, *args, executor=executor, timeout=timeout, **kwargs
+        )
+
+    async def avalidate_stream(
+        cls, iterable, *, executor=None, timeout=None, chunksize=None
+    ):
+        """validate the items of an async iterable in chunks, yielding valid items."""
+        from . import aio
+
+        async for x in aio.validate_stream(cls, iterable, executor, timeout, chunksize):
+            yield x
+
     def _attach_parent(cls, x):
         if isinstance(x, (type(None), bool)):
             return x
@@ -252,19 +447,97 @@ class Generic(Interface, abc.ABCMeta):
     def type(cls, **kwargs):
         if not isinstance(cls, tuple):
             cls = (cls,)
-        return type(getattr(cls[0], "__name__", repr(cls[0])), cls, kwargs)
+        t = type(getattr(cls[0], "__name__", repr(cls[0])), cls, kwargs)
+        return interned.created(t)
+
+
+def validate_each(cls, iterable, errors="raise"):
+    # validate_many with the methods of the type, one instance at a time
+    if errors == "mask":
+        return list(map(cls.is_valid, iterable))
+
+    result = []
+    for x in iterable:
+        try:
+            y = cls.validate(x)
+        except exceptions.ValidationErrors as e:
+            if errors == "raise":
+                raise
+            result.append(e)
+        else:
+            result.append(y if errors == "raise" else None)
+    return result
 
 
 class Form(metaclass=Generic):
     hypothesis_strategies = {}
+    # types with side effects in validation opt out of util.results
+    memoize = True
 
     @classmethod
     def schema(cls):
         return Generic.schema(cls)
 
+    @classmethod
+    def remembered(cls, *args):
+        # the util.results key of a single immutable value, None when not memoizing
+        if util.memoizing() and cls.memoize and len(args) == 1:
+            x, *_ = args
+            if type(x) in util.IMMUTABLE:
+                return cls.digest(), type(x), x
+
     @classmethod
     def validate(cls, *args):
-        return cls.schema().validate(*args)
+        k = cls.remembered(*args)
+        if k is not None and util.results.get(k):
+            return args[0]
+        x = cls.schema().validate(*args, key=cls.digest())
+        if k is not None:
+            util.results[k] = True
+        return x
+
+    @classmethod
+    def is_valid(cls, *args):
+        # the exception free check used by isinstance and composites. types that
+        # validate with more than their schema only pay for exceptions here.
+        if cls.portable():
+            k = cls.remembered(*args)
+            if k is not None and util.results.get(k):
+                return True
+            ok = cls.schema().checker(key=cls.digest())(*args)
+            if ok and k is not None:
+                util.results[k] = True
+            return ok
+        try:
+            cls.validate(*args)
+        except exceptions.ValidationErrors:
+            return False
+        return True
+
+    @classmethod
+    def iter_errors(cls, x, max_errors=None):
+        """lazily yield the errors of an instance, stopping after max_errors.
+
+        max_errors=1 is the cheapest way to the first error. types that validate
+        with more than their schema report that error after the schema errors."""
+
+        def errors():
+            n = 0
+            for n, e in enumerate(cls.schema().iter_errors(x), 1):
+                yield e
+            if not n and not cls.is_valid(x):
+                try:
+                    cls.validate(x)
+                except exceptions.ValidationErrors as e:
+                    yield e
+
+        return itertools.islice(errors(), max_errors)
+
+    @classmethod
+    def portable(cls):
+        # True when the schema alone decides validity, the schema can then stand in
+        # for the type in other processes.
+        return getattr(cls.validate, "__func__", None) is Form.validate.__func__
 
     def __new__(cls, *args, **kwargs):
         # schemata types bubble up instances from the bottom rather than top down.
@@ -337,12 +610,12 @@ class Type(Form):
         pass
 
     def object(cls, *args, **kwargs):
-        if not (args or kwargs) and issubclass(cls, cls.Default):
+        if not (args or kwargs) and type.__subclasscheck__(cls.Default, cls):
             f = cls.Default.forms(cls)
             if callable(f):
                 args, kwargs = (f(*args, **kwargs),), {}
 
-        if (args or kwargs) and not issubclass(cls, cls.Dict):
+        if (args or kwargs) and not type.__subclasscheck__(cls.Dict, cls):
             args, kwargs = (cls.validate(*args, **kwargs),), {}
 
         t = cls.concrete_type()
@@ -381,6 +654,12 @@ class Default(Form):
 
 
 class Plural(Form):
+    def __init_subclass__(cls, **kwargs):
+        # direct subclasses are forms that schema merge by appending to a tuple
+        super().__init_subclass__(**kwargs)
+        if any(b is Plural for b in cls.__bases__):
+            util.Schema.kinds[cls.form()] = tuple
+
     def type(cls, *args):
         if not args:
             return cls
@@ -407,16 +686,23 @@ class Numeric(Form):
 
 
 class Nested(Plural):
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if any(b is Nested for b in cls.__bases__):
+            util.Schema.kinds[cls.form()] = tuple
+
     @classmethod
     def type(cls, object):
         x = super().type(object)
         v = ()
         for y in cls.forms(x):
-            if issubclass(y, cls):
+            if type.__subclasscheck__(cls, y):
                 v += cls.forms(y)
             else:
                 v += (y,)
         x.__annotations__[cls.form()] = v
+        with util.suppress(AttributeError):
+            type.__delattr__(x, "_fingerprints")
         return x
 
 
@@ -427,6 +713,12 @@ class Value(Plural):
 
 
 class Mapping(Form):
+    def __init_subclass__(cls, **kwargs):
+        # direct subclasses are forms that schema merge by updating a dict
+        super().__init_subclass__(**kwargs)
+        if any(b is Mapping for b in cls.__bases__):
+            util.Schema.kinds[cls.form()] = dict
+
     @classmethod
     def forms(cls, *args):  # pragma: no cover
         return super().forms(*args) or {}
@@ -446,10 +738,8 @@ class MaxLength(Numeric):
 class Pattern(Form):
     @classmethod
     def type(cls, *x):
-        import re
-
         if isinstance(*x, str):
-            x = (re.compile(*x),)
+            x = (util.regex(*x),)
         return super().type(*x)
 
     def py(cls):
@@ -581,6 +871,15 @@ class FileExtension(Plural):
     pass
 
 
+class Backend(Form):
+    # the validation backend for a type, see util.register_backend
+    def type(cls, *args):
+        # an unknown backend fails here rather than at the first validation
+        if args:
+            util.backends[args[0]]
+        return super().type(*args)
+
+
 class Args(Plural):
     pass
 
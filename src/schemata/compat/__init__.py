@@ -54,7 +54,7 @@ def _get_signature_from_schema(s: dict):
             continue
 
         v = p[k]
-        if isinstance(v, type) and issubclass(v, base.Default):
+        if isinstance(v, type) and type.__subclasscheck__(base.Default, v):
             d = base.Default.forms(v)
             if not callable(d):
                 a += (
@@ -0,0 +1,109 @@
+"""vectorized validation of numeric arrays against List[Integer/Number] schema.
+
+numpy is only imported when an array, or a buffer like memoryview or array.array,
+is validated. without numpy buffers are validated as python lists.
+"""
+
+import array
+
+from .. import exceptions
+from ..compiler import KEYWORDS
+
+ARRAY = {"type", "items", "minItems", "maxItems", "uniqueItems"}
+ITEMS = {
+    "type",
+    "minimum",
+    "maximum",
+    "exclusiveMinimum",
+    "exclusiveMaximum",
+    "multipleOf",
+}
+
+
+def is_array(x):
+    return isinstance(x, (memoryview, array.array)) or hasattr(
+        x, "__array_interface__"
+    )
+
+
+def vectorized(schema):
+    # the subset of schema we can check with array operations
+    if schema.get("type", "array") != "array" or KEYWORDS & set(schema) - ARRAY:
+        return False
+    items = schema.get("items", True)
+    if items is True:
+        return True
+    if not isinstance(items, dict) or KEYWORDS & set(items) - ITEMS:
+        return False
+    return items.get("type") in {"integer", "number"}
+
+
+def invalid(cls, x, message, bad):
+    import numpy
+
+    indices = numpy.flatnonzero(bad)
+    i = indices[0]
+    e = exceptions.ValidationError(
+        f"{len(indices)} items {message}, the first is {x[i].item()!r} at index {i}"
+    )
+    e.indices = indices
+    raise e
+
+
+def validate(cls, x):
+    s = cls.schema().ravel()
+    try:
+        import numpy
+    except ImportError:
+        cls.schema().validate(x.tolist())
+        return x
+
+    a = numpy.asarray(x)
+    if a.ndim != 1 or a.dtype.kind not in "biuf" or not vectorized(s):
+        cls.schema().validate(a.tolist())
+        return x
+
+    n = len(a)
+    if n < s.get("minItems", 0):
+        raise exceptions.ValidationError(f"{n} items is fewer than {s['minItems']}")
+    if n > s.get("maxItems", n):
+        raise exceptions.ValidationError(f"{n} items is more than {s['maxItems']}")
+
+    items = s.get("items", True)
+    if isinstance(items, dict):
+        t = items.get("type")
+        if a.dtype.kind == "b" and n:
+            invalid(cls, a, f"are not of type {t}", numpy.ones(n, bool))
+        if t == "integer" and a.dtype.kind == "f":
+            bad = ~numpy.isfinite(a) | (a != numpy.floor(a))
+            if bad.any():
+                invalid(cls, a, "are not of type integer", bad)
+
+        for k, op in dict(
+            minimum=numpy.less,
+            maximum=numpy.greater,
+            exclusiveMinimum=numpy.less_equal,
+            exclusiveMaximum=numpy.greater_equal,
+        ).items():
+            if k in items:
+                bad = op(a, items[k])
+                if bad.any():
+                    invalid(cls, a, f"fail {k} {items[k]}", bad)
+
+        if "multipleOf" in items:
+            d = items["multipleOf"]
+            if isinstance(d, float) or a.dtype.kind == "f":
+                q = a / d
+                bad = numpy.trunc(q) != q
+            else:
+                bad = a % d != 0
+            if bad.any():
+                invalid(cls, a, f"are not a multiple of {d}", bad)
+
+    if s.get("uniqueItems"):
+        _, first = numpy.unique(a, return_index=True)
+        if len(first) != n:
+            bad = numpy.ones(n, bool)
+            bad[first] = False
+            invalid(cls, a, "are not unique", bad)
+    return x
@@ -0,0 +1,440 @@
+"""compile raveled schema into specialized python validators.
+
+the compiled functions answer one question, is an instance valid, without walking
+the schema through jsonschema's keyword dispatch. properties, items, and the
+composite keywords are unrolled into direct isinstance, length, range, and regex
+checks. schemas using a keyword the compiler does not know fall back to jsonschema.
+"""
+
+import fractions
+import itertools
+import numbers
+
+from . import util
+
+# jsonschema validation keywords the compiler can unroll. any other draft 7 keyword,
+# namely $ref, makes the schema unsupported. keywords outside of the draft 7
+# vocabulary are annotations and are ignored, just like jsonschema does.
+KEYWORDS = {
+    "additionalItems",
+    "additionalProperties",
+    "allOf",
+    "anyOf",
+    "const",
+    "contains",
+    "dependencies",
+    "enum",
+    "exclusiveMaximum",
+    "exclusiveMinimum",
+    "format",
+    "if",
+    "items",
+    "maxItems",
+    "maxLength",
+    "maxProperties",
+    "maximum",
+    "minItems",
+    "minLength",
+    "minProperties",
+    "minimum",
+    "multipleOf",
+    "not",
+    "oneOf",
+    "pattern",
+    "patternProperties",
+    "properties",
+    "propertyNames",
+    "required",
+    "type",
+    "uniqueItems",
+}
+UNSUPPORTED = {"$ref"}
+
+NUMBER = "(isinstance({x}, _number) and not isinstance({x}, bool))"
+TYPES = dict(
+    null="{x} is None",
+    boolean="isinstance({x}, bool)",
+    integer="(isinstance({x}, int) and not isinstance({x}, bool)"
+    " or isinstance({x}, float) and {x}.is_integer())",
+    number=NUMBER,
+    string="isinstance({x}, str)",
+    array="isinstance({x}, list)",
+    object="isinstance({x}, dict)",
+)
+
+
+def _multiple(x, d):
+    if isinstance(d, float):
+        q = x / d
+        try:
+            return int(q) == q
+        except OverflowError:
+            return (fractions.Fraction(x) / fractions.Fraction(d)).denominator == 1
+    return not x % d
+
+
+def _one(x, fs):
+    n = 0
+    for f in fs:
+        if f(x):
+            n += 1
+            if n > 1:
+                return False
+    return n == 1
+
+
+def _true(x):
+    return True
+
+
+def _false(x):
+    return False
+
+
+class Compiler:
+    def __init__(self):
+        self.lines, self.count, self.functions = [], itertools.count(), {}
+        self.namespace = dict(
+            _number=numbers.Number,
+            _multiple=_multiple,
+            _member=util.member,
+            _unique=util.unique,
+            _one=_one,
+            _true=_true,
+            _false=_false,
+            _formats=formats(),
+        )
+
+    def constant(self, value, prefix="_c"):
+        k = f"{prefix}{next(self.count)}"
+        self.namespace[k] = value
+        return k
+
+    def literal(self, value):
+        # finite numbers and strings are inlined, anything else is a named constant
+        if type(value) in (int, str, bool) or type(value) is float and value == value:
+            if value not in (float("inf"), float("-inf")):
+                return repr(value)
+        return self.constant(value)
+
+    def function(self, schema):
+        # each subschema becomes one function, equal subschemas share a function.
+        if schema is True:
+            return "_true"
+        if schema is False:
+            return "_false"
+        if not isinstance(schema, dict) or UNSUPPORTED.intersection(schema):
+            raise NotImplementedError
+        key = util.digest(schema)
+        if key not in self.functions:
+            body = self.body(schema)
+            self.functions[key] = name = f"_v{next(self.count)}"
+            self.lines += [f"def {name}(x):", *(f"    {x}" for x in body)]
+            self.lines += ["    return True", ""]
+        return self.functions[key]
+
+    def check(self, schema, x):
+        # an inline expression for trivial subschema, otherwise a function call
+        if isinstance(schema, dict) and UNSUPPORTED.intersection(schema):
+            raise NotImplementedError
+        if schema is True or isinstance(schema, dict) and not KEYWORDS & set(schema):
+            return "True"
+        if isinstance(schema, dict) and set(schema) & KEYWORDS == {"type"}:
+            with util.suppress(NotImplementedError):
+                return self.type(schema["type"], x)
+        return f"{self.function(schema)}({x})"
+
+    def type(self, t, x="x"):
+        if isinstance(t, str):
+            t = [t]
+        if not all(isinstance(t, str) and t in TYPES for t in t):
+            raise NotImplementedError
+        return "(" + " or ".join(TYPES[t].format(x=x) for t in t) + ")"
+
+    def body(self, schema):
+        s, lines = schema, []
+
+        if "type" in s:
+            lines += [f"if not {self.type(s['type'])}: return False"]
+        for v in (list(s["enum"]),) if "enum" in s else ():
+            lines += [f"if not {self.member(v)}: return False"]
+        for v in ([s["const"]],) if "const" in s else ():
+            lines += [f"if not {self.member(v)}: return False"]
+        if "format" in s:
+            v = self.literal(s["format"])
+            lines += [f"if not _formats.conforms(x, {v}): return False"]
+
+        lines += self.guard(NUMBER.format(x="x"), self.numeric(s))
+        lines += self.guard("isinstance(x, str)", self.string(s))
+        lines += self.guard("isinstance(x, list)", self.array(s))
+        lines += self.guard("isinstance(x, dict)", self.object(s))
+
+        for t in s.get("allOf", ()):
+            lines += [f"if not {self.check(t, 'x')}: return False"]
+        if "anyOf" in s:
+            v = " or ".join(self.check(t, "x") for t in s["anyOf"])
+            lines += [f"if not ({v or 'False'}): return False"]
+        if "oneOf" in s:
+            v = ", ".join(self.function(t) for t in s["oneOf"])
+            lines += [f"if not _one(x, ({v},)): return False"]
+        if "not" in s:
+            lines += [f"if {self.check(s['not'], 'x')}: return False"]
+        if "if" in s:
+            then, otherwise = s.get("then", True), s.get("else", True)
+            lines += [
+                f"if {self.check(s['if'], 'x')}:",
+                f"    if not {self.check(then, 'x')}: return False",
+                f"elif not {self.check(otherwise, 'x')}: return False",
+            ]
+        return lines
+
+    def member(self, values):
+        try:
+            index = self.constant(frozenset(map(util.canonical, values)))
+        except TypeError:
+            raise NotImplementedError
+        return f"_member(x, {index}, {self.constant(values)})"
+
+    def guard(self, condition, lines):
+        return [f"if {condition}:", *(f"    {x}" for x in lines)] if lines else []
+
+    def numeric(self, s):
+        lines = []
+        for k, op in dict(
+            minimum="<", maximum=">", exclusiveMinimum="<=", exclusiveMaximum=">="
+        ).items():
+            if k in s:
+                lines += [f"if x {op} {self.literal(s[k])}: return False"]
+        if "multipleOf" in s:
+            v = self.literal(s["multipleOf"])
+            lines += [f"if not _multiple(x, {v}): return False"]
+        return lines
+
+    def string(self, s):
+        lines = []
+        if "minLength" in s:
+            lines += [f"if len(x) < {self.literal(s['minLength'])}: return False"]
+        if "maxLength" in s:
+            lines += [f"if len(x) > {self.literal(s['maxLength'])}: return False"]
+        if "pattern" in s:
+            p = self.constant(util.regex(s["pattern"]), "_re")
+            lines += [f"if {p}.search(x) is None: return False"]
+        return lines
+
+    def array(self, s):
+        lines = []
+        if "minItems" in s:
+            lines += [f"if len(x) < {self.literal(s['minItems'])}: return False"]
+        if "maxItems" in s:
+            lines += [f"if len(x) > {self.literal(s['maxItems'])}: return False"]
+        items = s.get("items", True)
+        if isinstance(items, list):
+            for i, t in enumerate(items):
+                v = self.check(t, f"x[{i}]")
+                lines += [f"if len(x) > {i} and not {v}: return False"]
+            extra = s.get("additionalItems", True)
+            if extra is False:
+                lines += [f"if len(x) > {len(items)}: return False"]
+            elif extra is not True:
+                f = self.function(extra)
+                lines += [f"for v in x[{len(items)}:]:"]
+                lines += [f"    if not {f}(v): return False"]
+        elif items is False:
+            lines += ["if x: return False"]
+        elif self.check(items, "v") != "True":
+            v = self.check(items, "v")
+            lines += ["for v in x:", f"    if not {v}: return False"]
+        if s.get("uniqueItems"):
+            lines += ["if not _unique(x): return False"]
+        if "contains" in s:
+            v = self.check(s["contains"], "v")
+            lines += [f"if not any({v} for v in x): return False"]
+        return lines
+
+    def object(self, s):
+        lines = []
+        for k in s.get("required", ()):
+            lines += [f"if {self.literal(k)} not in x: return False"]
+        if "minProperties" in s:
+            lines += [f"if len(x) < {self.literal(s['minProperties'])}: return False"]
+        if "maxProperties" in s:
+            lines += [f"if len(x) > {self.literal(s['maxProperties'])}: return False"]
+        properties = s.get("properties", {})
+        for k, t in properties.items():
+            k = self.literal(k)
+            v = self.check(t, f"x[{k}]")
+            if v != "True":
+                lines += [f"if {k} in x and not {v}: return False"]
+
+        patterns = [
+            (self.constant(util.regex(k), "_re"), self.check(t, "v"))
+            for k, t in s.get("patternProperties", {}).items()
+        ]
+        extra = s.get("additionalProperties", True)
+        if patterns or extra is not True:
+            lines += ["for k, v in x.items():"]
+            for p, v in patterns:
+                lines += [f"    if {p}.search(k) and not {v}: return False"]
+            if extra is not True:
+                known = self.constant(frozenset(properties))
+                matched = " or ".join(f"{p}.search(k)" for p, _ in patterns)
+                lines += [
+                    f"    if k not in {known}"
+                    + (f" and not ({matched})" if matched else "")
+                    + f" and not {self.check(extra, 'v')}: return False"
+                ]
+        if "propertyNames" in s:
+            v = self.check(s["propertyNames"], "k")
+            lines += ["for k in x:", f"    if not {v}: return False"]
+        for k, t in s.get("dependencies", {}).items():
+            k = self.literal(k)
+            if isinstance(t, list):
+                v = " or ".join(f"{self.literal(u)} not in x" for u in t)
+                if v:
+                    lines += [f"if {k} in x and ({v}): return False"]
+            else:
+                lines += [f"if {k} in x and not {self.check(t, 'x')}: return False"]
+        return lines
+
+
+def formats():
+    from . import formats
+
+    return formats
+
+
+def compile(schema):
+    """compile a raveled schema into a function that returns True for valid instances.
+
+    None is returned when the schema uses keywords the compiler does not support."""
+    c = Compiler()
+    try:
+        name = c.function(schema)
+    except NotImplementedError:
+        return None
+    exec("\n".join(c.lines), c.namespace)
+    return c.namespace[name]
+
+
+def supported(schema):
+    # True when no subschema uses a keyword the compiler does not know
+    if isinstance(schema, dict):
+        return not UNSUPPORTED.intersection(schema) and all(
+            map(supported, schema.values())
+        )
+    if isinstance(schema, list):
+        return all(map(supported, schema))
+    return True
+
+
+def check(schema):
+    # the compiled predicate of a subschema, shared with the compiled backend
+    if isinstance(schema, bool):
+        return _true if schema else _false
+    k = "compiled", util.digest(schema)
+    f = util.checkers.get(k)
+    if f is None:
+        f = util.checkers[k] = compile(schema) or util.draft7(schema).is_valid
+    return f
+
+
+def error(schema, x, path=()):
+    # the first error of an invalid instance, its path prefixed with path
+    e = next(iter(util.Schema.iter_errors(schema, x)))
+    e.path = (*path, *e.path)
+    return e
+
+
+def _check(checks, t, k=None):
+    # the predicates of a walk are found once by the identity of their subschema,
+    # rather than digested again for every element
+    f = checks.get((k, id(t)))
+    if f is None:
+        f = checks[k, id(t)] = check(t if k is None else {k: t})
+    return f
+
+
+def iter_errors(schema, x, path=(), schema_path=(), checks=None):
+    """lazily yield an exceptions.Error for each failing keyword of a raveled schema.
+
+    valid subschema are skipped by their compiled predicate, the walk only descends
+    into the invalid parts of the instance."""
+    from .exceptions import Error
+
+    if checks is None:
+        checks = {}
+    if _check(checks, schema)(x):
+        return
+    if schema is False:
+        yield Error(x, "false", False, path, schema_path)
+        return
+
+    s = schema
+    for k, v in s.items():
+        p = schema_path + (k,)
+        if k == "properties" and isinstance(x, dict):
+            for key, t in v.items():
+                if key in x:
+                    yield from iter_errors(t, x[key], path + (key,), p + (key,), checks)
+        elif k == "patternProperties" and isinstance(x, dict):
+            for pattern, t in v.items():
+                for key in x:
+                    if util.regex(pattern).search(key):
+                        yield from iter_errors(
+                            t, x[key], path + (key,), p + (pattern,), checks
+                        )
+        elif k == "additionalProperties" and isinstance(x, dict):
+            patterns = s.get("patternProperties", {})
+            extra = [
+                key
+                for key in x
+                if key not in s.get("properties", {})
+                and not any(util.regex(p).search(key) for p in patterns)
+            ]
+            if v is False and extra:
+                yield Error(x, k, v, path, p)
+            for key in extra if v is not False else ():
+                yield from iter_errors(v, x[key], path + (key,), p, checks)
+        elif k == "items" and isinstance(x, list):
+            if isinstance(v, list):
+                for i, (t, y) in enumerate(zip(v, x)):
+                    yield from iter_errors(t, y, path + (i,), p + (i,), checks)
+            else:
+                f = _check(checks, v)
+                for i, y in enumerate(x):
+                    if not f(y):
+                        yield from iter_errors(v, y, path + (i,), p, checks)
+        elif k == "additionalItems" and isinstance(x, list):
+            n = len(s["items"]) if isinstance(s.get("items"), list) else len(x)
+            if v is False and len(x) > n:
+                yield Error(x, k, v, path, p)
+            f = _check(checks, v)
+            for i in range(n, len(x)) if v is not False else ():
+                if not f(x[i]):
+                    yield from iter_errors(v, x[i], path + (i,), p, checks)
+        elif k == "required" and isinstance(x, dict):
+            for key in v:
+                if key not in x:
+                    yield Error(x, k, key, path, p)
+        elif k == "dependencies" and isinstance(x, dict):
+            for key, t in v.items():
+                if key in x and isinstance(t, list):
+                    for u in t:
+                        if u not in x:
+                            yield Error(x, k, u, path, p + (key,))
+                elif key in x:
+                    yield from iter_errors(t, x, path, p + (key,), checks)
+        elif k == "propertyNames" and isinstance(x, dict):
+            for key in x:
+                yield from iter_errors(v, key, path, p, checks)
+        elif k == "allOf":
+            for i, t in enumerate(v):
+                yield from iter_errors(t, x, path, p + (i,), checks)
+        elif k == "if":
+            branch = "then" if _check(checks, v)(x) else "else"
+            if branch in s:
+                yield from iter_errors(
+                    s[branch], x, path, schema_path + (branch,), checks
+                )
+        elif k in KEYWORDS and not _check(checks, v, k)(x):
+            yield Error(x, k, v, path, p)
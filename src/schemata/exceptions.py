@@ -12,3 +12,74 @@ ValidationErrors = (
     ValueError,
     ConsentException,
 )
+
+
+class Error(ValidationError):
+    # a structured validation error, the message is only built when it is read.
+    messages = dict(
+        type="{instance!r} is not of type {expected!r}",
+        enum="{instance!r} is not one of {expected!r}",
+        const="{expected!r} was expected",
+        minimum="{instance!r} is less than the minimum of {expected!r}",
+        maximum="{instance!r} is greater than the maximum of {expected!r}",
+        exclusiveMinimum="{instance!r} is not greater than {expected!r}",
+        exclusiveMaximum="{instance!r} is not less than {expected!r}",
+        multipleOf="{instance!r} is not a multiple of {expected!r}",
+        minLength="{instance!r} is shorter than {expected!r}",
+        maxLength="{instance!r} is longer than {expected!r}",
+        minItems="{instance!r} has fewer than {expected!r} items",
+        maxItems="{instance!r} has more than {expected!r} items",
+        minProperties="{instance!r} has fewer than {expected!r} properties",
+        maxProperties="{instance!r} has more than {expected!r} properties",
+        required="{expected!r} is a required property",
+        dependencies="{expected!r} is a dependency",
+        pattern="{instance!r} does not match {expected!r}",
+        format="{instance!r} is not a {expected!r}",
+        uniqueItems="{instance!r} is not unique",
+        contains="none of {instance!r} are valid under the given schema",
+        additionalItems="additional items are not allowed in {instance!r}",
+        additionalProperties="additional properties are not allowed in {instance!r}",
+        anyOf="{instance!r} is not valid under any of the given schemas",
+        oneOf="{instance!r} is not valid under exactly one of the given schemas",
+        allOf="{instance!r} is not valid under all of the given schemas",
+        false="false schema does not allow {instance!r}",
+    )
+    messages["not"] = "{instance!r} should not be valid under {expected!r}"
+
+    def __init__(self, instance, keyword, expected, path=(), schema_path=()):
+        super().__init__(instance, keyword, expected, path, schema_path)
+        self.instance, self.keyword, self.expected = instance, keyword, expected
+        self.path, self.schema_path = tuple(path), tuple(schema_path)
+
+    @classmethod
+    def wrap(cls, error):
+        # the same structure from a jsonschema error
+        return cls(
+            error.instance,
+            error.validator,
+            error.validator_value,
+            error.absolute_path,
+            error.absolute_schema_path,
+        )
+
+    def __reduce__(self):
+        # errors cross process boundaries in parallel validation
+        return type(self), (
+            self.instance,
+            self.keyword,
+            self.expected,
+            self.path,
+            self.schema_path,
+        )
+
+    @property
+    def message(self):
+        return self.messages.get(
+            self.keyword, "{instance!r} is not valid under {keyword} {expected!r}"
+        ).format(**vars(self))
+
+    def __str__(self):
+        return self.message
+
+    def __repr__(self):
+        return f"<{type(self).__name__} {self.keyword} at {list(self.path)}>"
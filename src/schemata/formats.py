@@ -0,0 +1,173 @@
+"""string format checks for the schemata.strings types and the validators.
+
+each format is a precompiled regex or a fast parser rather than jsonschema's
+generic FormatChecker dispatch. expensive checks remember recent results in a
+bounded cache, repetitive columns of ip addresses or dates are then checked once
+per distinct value. formats not defined here fall back to jsonschema's checker.
+"""
+
+import datetime
+import functools
+import ipaddress
+import re
+
+from . import util
+
+formats = {}
+memo = util.Lru(4096)
+
+DATE = re.compile(r"^\d{4}-\d{2}-\d{2}$", re.ASCII)
+DATETIME = re.compile(
+    r"^(\d{4})-(\d{2})-(\d{2})[Tt](\d{2}):(\d{2}):(\d{2})(\.\d+)?"
+    r"([Zz]|[+-](\d{2}):(\d{2}))$",
+    re.ASCII,
+)
+LABEL = r"[a-z\d]([a-z\d-]{0,61}[a-z\d])?"
+HOSTNAME = re.compile(
+    rf"^(?=.{{1,253}}$){LABEL}(\.{LABEL})*$", re.ASCII | re.IGNORECASE
+)
+POINTER = re.compile(r"^(/([^~/]|~[01])*)*$")
+VARIABLE = r"[A-Za-z0-9_.%]+(:[1-9]\d{0,3}|\*)?"
+URITEMPLATE = re.compile(
+    rf"^([^{{}}]|\{{[+#./;?&=,!@|]?{VARIABLE}(,{VARIABLE})*\}})*$", re.ASCII
+)
+DAYS = 31, 29, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31
+
+
+@functools.lru_cache(None)
+def fallback():
+    # jsonschema's checks for the formats not defined here
+    import jsonschema
+
+    # the format checker attribute is new in jsonschema 4.5
+    f = getattr(jsonschema.Draft7Validator, "FORMAT_CHECKER", None)
+    return f or jsonschema.draft7_format_checker
+
+
+@functools.lru_cache(None)
+def checker():
+    """a jsonschema FormatChecker that uses these formats."""
+    import jsonschema
+
+    c = jsonschema.FormatChecker(())
+    c.checkers = dict(fallback().checkers)
+    for name in formats:
+        c.checkers[name] = functools.partial(conforms, format=name), ()
+    return c
+
+
+def register(name, memo=False):
+    """register a predicate for a string format, memo caches its results."""
+
+    def decorator(f):
+        formats[name] = f, memo
+        checker.cache_clear()
+        return f
+
+    return decorator
+
+
+@register("email")
+def email(x):
+    return "@" in x
+
+
+@register("date-time")
+def date_time(x):
+    m = DATETIME.fullmatch(x)
+    if m is None:
+        return False
+    y, mo, d, h, mi, s, _, _, oh, om = m.groups()
+    y, mo, d = int(y), int(mo), int(d)
+    leap = not y % 4 and (y % 100 or not y % 400)
+    if not 1 <= mo <= 12 or not 1 <= d <= DAYS[mo - 1]:
+        return False
+    if mo == 2 and d == 29 and not leap:
+        return False
+    if int(h) > 23 or int(mi) > 59 or int(s) > 60:
+        return False
+    return oh is None or int(oh) <= 23 and int(om) <= 59
+
+
+@register("date", memo=True)
+def date(x):
+    try:
+        return bool(DATE.fullmatch(x) and datetime.date(*map(int, x.split("-"))))
+    except ValueError:
+        return False
+
+
+@register("time")
+def time(x):
+    return date_time("1970-01-01T" + x)
+
+
+@register("hostname")
+def hostname(x):
+    return HOSTNAME.fullmatch(x) is not None
+
+
+@register("ipv4", memo=True)
+def ipv4(x):
+    try:
+        ipaddress.IPv4Address(x)
+    except ipaddress.AddressValueError:
+        return False
+    return True
+
+
+@register("ipv6", memo=True)
+def ipv6(x):
+    try:
+        return not getattr(ipaddress.IPv6Address(x), "scope_id", "")
+    except ipaddress.AddressValueError:
+        return False
+
+
+@register("json-pointer")
+def json_pointer(x):
+    return POINTER.fullmatch(x) is not None
+
+
+@register("uri-template")
+def uri_template(x):
+    return URITEMPLATE.fullmatch(x) is not None
+
+
+@register("regex", memo=True)
+def regex(x):
+    try:
+        util.regex(x)
+    except re.error:
+        return False
+    return True
+
+
+def conforms(x, format):
+    """True when x conforms to format, formats only constrain strings."""
+    if not isinstance(x, str):
+        return True
+    if format not in formats:
+        return fallback().conforms(x, format)
+    f, cached = formats[format]
+    if not cached:
+        return f(x)
+    k = format, x
+    v = memo.get(k)
+    if v is None:
+        v = memo[k] = f(x)
+    return v
+
+
+def check_many(format, values):
+    """check many values against one format, each distinct string is checked once."""
+    seen = {}
+
+    def check(x):
+        if not isinstance(x, str):
+            return True
+        if x not in seen:
+            seen[x] = conforms(x, format)
+        return seen[x]
+
+    return list(map(check, values))
@@ -0,0 +1,76 @@
+"""validate large collections in chunks on a pool of worker processes.
+
+schemata types are dynamic classes that can't be pickled, so workers receive the
+raveled schema and the backend name instead. each worker compiles its checker once
+per schema and caches it like the parent process does. errors carry the global
+index of their element as the first item of their path.
+"""
+
+import concurrent.futures
+import contextlib
+import os
+
+from . import compiler, util
+
+
+def chunks(items, chunksize=None, workers=None):
+    # about four chunks per worker keeps the pool busy while the tail finishes
+    n = len(items)
+    if not chunksize:
+        chunksize = max(1, -(-n // (4 * (workers or os.cpu_count() or 1))))
+    for i in range(0, n, chunksize):
+        yield i, items[i : i + chunksize]
+
+
+def chunk(schema, backend, start, items, errors):
+    # the work done in the worker process for one chunk
+    check = util.Schema.checker(schema, backend)
+    if errors == "mask":
+        return list(map(check, items))
+    if errors == "collect":
+        return [
+            None if check(x) else compiler.error(schema, x, (i,))
+            for i, x in enumerate(items, start)
+        ]
+    for i, x in enumerate(items, start):
+        if not check(x):
+            return compiler.error(schema, x, (i,))
+
+
+@contextlib.contextmanager
+def pool(executor):
+    # "processes" starts a pool for the call, executors are borrowed
+    if executor == "processes":
+        with concurrent.futures.ProcessPoolExecutor() as executor:
+            yield executor
+    elif isinstance(executor, concurrent.futures.Executor):
+        yield executor
+    else:
+        raise ValueError(f"executor must be an Executor or 'processes', not {executor}")
+
+
+def validate_many(schema, items, errors="raise", executor="processes", chunksize=None):
+    """validate items against a raveled schema on a pool of workers.
+
+    the results have the same shape as Generic.validate_many, errors="raise" raises
+    the error of the element with the lowest index."""
+    s = util.Schema.ravel(schema)
+    backend = s.get("backend") or util.get_backend()
+    items = list(items)
+    with pool(executor) as executor:
+        workers = getattr(executor, "_max_workers", None)
+        futures = [
+            executor.submit(chunk, s, backend, i, x, errors)
+            for i, x in chunks(items, chunksize, workers)
+        ]
+        try:
+            if errors == "raise":
+                for future in futures:
+                    e = future.result()
+                    if e is not None:
+                        raise e
+                return items
+            return [x for future in futures for x in future.result()]
+        finally:
+            for future in futures:
+                future.cancel()
@@ -0,0 +1,250 @@
+"""incremental validation of json documents too large to hold in memory.
+
+the top level array or object is parsed one element at a time with
+json.JSONDecoder.raw_decode over a buffered window of the file. each element is
+validated against its subschema as it arrives, the keywords about the whole
+container are checked with running counters. peak memory is bounded by the largest
+element, plus the keys or hashes that required and uniqueItems must remember.
+"""
+
+import io
+import json
+
+from . import compiler, exceptions, util
+
+# the keywords of the top level schema that can be checked one element at a time
+ARRAY = {
+    "type",
+    "items",
+    "additionalItems",
+    "minItems",
+    "maxItems",
+    "uniqueItems",
+    "contains",
+}
+OBJECT = {
+    "type",
+    "properties",
+    "patternProperties",
+    "additionalProperties",
+    "required",
+    "minProperties",
+    "maxProperties",
+    "propertyNames",
+    "dependencies",
+}
+CHUNK = 1 << 16
+WHITESPACE = " \t\n\r"
+NUMBER = "0123456789+-.eE"
+
+
+class Reader:
+    # a window over a text file, the consumed prefix is dropped on each read.
+    decoder = json.JSONDecoder()
+
+    def __init__(self, file, size=CHUNK, owned=False):
+        self.file, self.size, self.buffer, self.index = file, size, "", 0
+        self.eof, self.owned = False, owned
+
+    def close(self):
+        # only files opened from a path are closed
+        if self.owned:
+            self.file.close()
+
+    def fill(self, size=None):
+        chunk = self.file.read(size or self.size)
+        self.buffer, self.index = self.buffer[self.index :] + chunk, 0
+        self.eof = not chunk
+        return chunk
+
+    def peek(self):
+        # the next character that is not whitespace, empty at the end of the file.
+        while True:
+            n = len(self.buffer)
+            while self.index < n and self.buffer[self.index] in WHITESPACE:
+                self.index += 1
+            if self.index < n:
+                return self.buffer[self.index]
+            if not self.fill():
+                return ""
+
+    def expect(self, chars):
+        c = self.peek()
+        if not c or c not in chars:
+            raise exceptions.ValidationError(f"expected one of {chars!r}, found {c!r}")
+        self.index += 1
+        return c
+
+    def value(self):
+        # decode one value, reading more while it runs to the end of the window.
+        # the read size doubles so elements larger than a chunk decode in
+        # logarithmically many attempts.
+        self.peek()
+        size = self.size
+        while True:
+            try:
+                x, end = self.decoder.raw_decode(self.buffer, self.index)
+                # a number at the end of the window may continue in the next chunk
+                tail = self.buffer[end:].lstrip(NUMBER)
+                if self.eof or tail or not isinstance(x, (int, float)):
+                    self.index = end
+                    return x
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self.fill(size)
+            size *= 2
+
+
+def reader(file):
+    if isinstance(file, Reader):
+        return file
+    if isinstance(file, (str, util.Path)):
+        return Reader(open(file, encoding="utf-8"), owned=True)
+    if isinstance(file, (io.RawIOBase, io.BufferedIOBase)):
+        file = io.TextIOWrapper(file, encoding="utf-8")
+    return Reader(file)
+
+
+def unsupported(schema, keywords):
+    # keywords that need the whole container, like enum or anyOf, can't be streamed
+    extra = compiler.KEYWORDS.intersection(schema) - keywords
+    if isinstance(schema.get("dependencies"), dict):
+        if not all(isinstance(x, list) for x in schema["dependencies"].values()):
+            extra.add("dependencies")
+    if extra:
+        raise NotImplementedError(f"{sorted(extra)} can not be validated incrementally")
+
+
+def allows(schema, t):
+    v = schema.get("type", t)
+    return t in ([v] if isinstance(v, str) else v)
+
+
+def check(schema, x, path):
+    # raise the first error of an element with its path from the document root
+    if not compiler.check(schema)(x):
+        raise compiler.error(schema, x, path)
+    return x
+
+
+def array(schema, file):
+    """yield the valid elements of a json array read incrementally from file."""
+    s = util.Schema.ravel(schema)
+    unsupported(s, ARRAY)
+    r = reader(file)
+    try:
+        yield from _array(s, r)
+    finally:
+        r.close()
+
+
+def _array(s, r):
+    if not allows(s, "array"):
+        raise exceptions.Error([], "type", s["type"], (), ("type",))
+    r.expect("[")
+
+    items, extra = s.get("items", True), s.get("additionalItems", True)
+    unique, seen = s.get("uniqueItems", False), set()
+    contains, found = s.get("contains"), "contains" not in s
+    n = 0
+    while r.peek() != "]":
+        if n:
+            r.expect(",")
+        x = r.value()
+        if isinstance(items, list):
+            check(items[n] if n < len(items) else extra, x, (n,))
+        else:
+            check(items, x, (n,))
+        if unique:
+            # the same json equality as util.unique
+            k = util.canonical(x)
+            if k in seen:
+                raise exceptions.Error(x, "uniqueItems", True, (n,), ("uniqueItems",))
+            seen.add(k)
+        if not found:
+            found = compiler.check(contains)(x)
+        n += 1
+        if n > s.get("maxItems", n):
+            raise exceptions.Error(n, "maxItems", s["maxItems"], (), ("maxItems",))
+        yield x
+    r.expect("]")
+    if n < s.get("minItems", 0):
+        raise exceptions.Error(n, "minItems", s["minItems"], (), ("minItems",))
+    if not found:
+        raise exceptions.Error([], "contains", contains, (), ("contains",))
+
+
+def object(schema, file):
+    """yield the valid key, value pairs of a json object read incrementally."""
+    s = util.Schema.ravel(schema)
+    unsupported(s, OBJECT)
+    r = reader(file)
+    try:
+        yield from _object(s, r)
+    finally:
+        r.close()
+
+
+def _object(s, r):
+    if not allows(s, "object"):
+        raise exceptions.Error({}, "type", s["type"], (), ("type",))
+    r.expect("{")
+
+    properties, extra = s.get("properties", {}), s.get("additionalProperties", True)
+    patterns = [(util.regex(k), t) for k, t in s.get("patternProperties", {}).items()]
+    names = s.get("propertyNames", True)
+    # only the keys that required and dependencies ask about are remembered
+    wanted = set(s.get("required", ()))
+    for k, v in s.get("dependencies", {}).items():
+        wanted.update((k, *v))
+    keys = set()
+    n = 0
+    while r.peek() != "}":
+        if n:
+            r.expect(",")
+        k = r.value()
+        if not isinstance(k, str):
+            raise exceptions.ValidationError(f"expected a property name, found {k!r}")
+        r.expect(":")
+        v = r.value()
+        check(names, k, (k,))
+        matched = [t for p, t in patterns if p.search(k)]
+        for t in matched + ([properties[k]] if k in properties else []):
+            check(t, v, (k,))
+        if not matched and k not in properties:
+            if extra is False:
+                raise exceptions.Error(
+                    k, "additionalProperties", False, (k,), ("additionalProperties",)
+                )
+            check(extra, v, (k,))
+        if k in wanted:
+            keys.add(k)
+        n += 1
+        if n > s.get("maxProperties", n):
+            raise exceptions.Error(
+                n, "maxProperties", s["maxProperties"], (), ("maxProperties",)
+            )
+        yield k, v
+    r.expect("}")
+    if n < s.get("minProperties", 0):
+        raise exceptions.Error(
+            n, "minProperties", s["minProperties"], (), ("minProperties",)
+        )
+    for k in s.get("required", ()):
+        if k not in keys:
+            raise exceptions.Error(sorted(keys), "required", k, (), ("required",))
+    for k, v in s.get("dependencies", {}).items():
+        for u in v if k in keys else ():
+            if u not in keys:
+                raise exceptions.Error(
+                    sorted(keys), "dependencies", u, (), ("dependencies", k)
+                )
+
+
+def iterate(schema, file):
+    """stream an array or object, whichever the document holds."""
+    r = reader(file)
+    if r.peek() == "{":
+        return object(schema, r)
+    return array(schema, r)
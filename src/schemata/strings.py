@@ -1,6 +1,17 @@
 import datetime
 
-from . import base, mediatypes, types
+from . import base, mediatypes, types, util
+
+
+def parser(format):
+    # parse.compile builds its regular expressions on every call
+    import parse
+
+    k = "parse", format
+    p = util.patterns.get(k)
+    if p is None:
+        p = util.patterns[k] = parse.compile(format)
+    return p
 
 
 # set default datetimes to now
@@ -38,11 +49,11 @@ class HostName(types.String, types.String.Format["hostname"]):
     pass
 
 
-class IPv4(types.String, types.String.Format["ipyv4"]):
+class IPv4(types.String, types.String.Format["ipv4"]):
     pass
 
 
-class IPv6(types.String, types.String.Format["ipyv6"]):
+class IPv6(types.String, types.String.Format["ipv6"]):
     pass
 
 
@@ -67,17 +78,12 @@ class UriTemplate(types.String, types.String.Format["uri-template"]):
 class Regex(types.String, types.String.Format["regex"]):
     @classmethod
     def object(cls, *args):
-        import re
-
-        return re.compile(super().object(*args))
+        return util.regex(super().object(*args))
 
 
 class Fstring(types.String):
     def type(cls, object):
-        import parse
-
-        _parse = parse.compile(object)
-        return cls + cls.Pattern[_parse._match_re]
+        return cls + cls.Pattern[parser(object)._match_re]
 
 
 class Parse(base.Pattern, types.String):
@@ -87,9 +93,7 @@ class Parse(base.Pattern, types.String):
 
     @classmethod
     def type(cls, *args):
-        import parse
-
-        return cls + cls.Pattern[parse.compile(*args)]
+        return cls + cls.Pattern[parser(*args)]
 
 
 class Jinja(types.Instance["jinja2.Template"]):
@@ -0,0 +1,193 @@
+"""structural subtyping between raveled schema.
+
+a schema is a subtype of another when every instance valid for the first is valid
+for the second. the check is sound but incomplete, a False may only mean the
+answer isn't known. Generic.__subclasscheck__ asks after the nominal check fails,
+the answers are remembered for each pair of schema digests.
+"""
+
+import fractions
+
+from . import compiler, util
+
+memo = util.Lru(4096)
+
+LOWER = "minLength", "minItems", "minProperties"
+UPPER = "maxLength", "maxItems", "maxProperties"
+
+
+def types(s):
+    # the json types a schema admits, None when it admits any
+    if isinstance(s, bool):
+        return None if s else set()
+    t = s.get("type")
+    if t is None:
+        return None
+    return {t} if isinstance(t, str) else set(t)
+
+
+def _types(sup, sub):
+    a, b = types(sup), types(sub)
+    if b is None:
+        return False
+    if "number" in a:
+        a = a | {"integer"}
+    return b <= a
+
+
+def _disjoint(a, b):
+    # no instance is valid for both schema, as far as their types tell. the false
+    # schema admits nothing so it is disjoint from everything.
+    a, b = types(a), types(b)
+    if a == set() or b == set():
+        return True
+    if a is None or b is None:
+        return False
+    for t in (a, b):
+        if "number" in t:
+            t.add("integer")
+    return not a & b
+
+
+def _one(sup, sub):
+    # sub is within one branch and shares no type with the others
+    for i, x in enumerate(sup["oneOf"]):
+        if subsumes(x, sub):
+            rest = sup["oneOf"][:i] + sup["oneOf"][i + 1 :]
+            return all(_disjoint(sub, y) for y in rest)
+    return False
+
+
+def _bound(sup, sub, inclusive, exclusive, tighter):
+    # the lower or upper numeric bounds of sub within those of sup
+    for k in (inclusive, exclusive):
+        if k not in sup:
+            continue
+        v, ok = sup[k], False
+        if inclusive in sub:
+            ok = tighter(sub[inclusive], v) or (
+                k == inclusive and sub[inclusive] == v
+            )
+        if exclusive in sub:
+            ok = ok or tighter(sub[exclusive], v) or sub[exclusive] == v
+        if not ok:
+            return False
+    return True
+
+
+def _multiple(sup, sub):
+    if "multipleOf" not in sub:
+        return False
+    try:
+        q = fractions.Fraction(str(sub["multipleOf"])) / fractions.Fraction(
+            str(sup["multipleOf"])
+        )
+    except (ValueError, ZeroDivisionError):
+        return False
+    return q.denominator == 1
+
+
+def _properties(sup, sub):
+    theirs, extra = sub.get("properties", {}), sub.get("additionalProperties", True)
+    for k, v in sup["properties"].items():
+        if k in theirs:
+            if not subsumes(v, theirs[k]):
+                return False
+        elif "patternProperties" in sub or not subsumes(v, extra):
+            return False
+    return True
+
+
+def _additional(sup, sub):
+    mine, extra = sup.get("properties", {}), sup["additionalProperties"]
+    if sub.get("patternProperties") != sup.get("patternProperties"):
+        return False
+    return subsumes(extra, sub.get("additionalProperties", True)) and all(
+        subsumes(extra, v) for k, v in sub.get("properties", {}).items() if k not in mine
+    )
+
+
+def keyword(sup, sub, k):
+    # sub implies the keyword k of sup
+    v = sup[k]
+    if k == "type":
+        return _types(sup, sub)
+    if k in LOWER:
+        return sub.get(k, 0) >= v
+    if k in UPPER:
+        return k in sub and sub[k] <= v
+    if k in ("minimum", "exclusiveMinimum"):
+        return _bound(sup, sub, "minimum", "exclusiveMinimum", lambda a, b: a > b)
+    if k in ("maximum", "exclusiveMaximum"):
+        return _bound(sup, sub, "maximum", "exclusiveMaximum", lambda a, b: a < b)
+    if k == "multipleOf":
+        return _multiple(sup, sub)
+    if k == "required":
+        return set(v) <= set(sub.get("required", ()))
+    if k == "uniqueItems":
+        return not v or sub.get(k, False)
+    if k == "items" and isinstance(v, dict) and isinstance(sub.get(k, {}), dict):
+        return subsumes(v, sub.get(k, True))
+    if k == "properties":
+        return _properties(sup, sub)
+    if k == "additionalProperties":
+        return _additional(sup, sub)
+    if k == "patternProperties":
+        return sub.get(k) == v and _additional(dict(sup, additionalProperties=True), sub)
+    if k == "anyOf":
+        return any(subsumes(x, sub) for x in v)
+    if k == "allOf":
+        return all(subsumes(x, sub) for x in v)
+    if k == "oneOf":
+        return _one(sup, sub)
+    if k == "enum":
+        return False
+    if k == "if":
+        k = "if", "then", "else"
+        return util.canonical([sub.get(x) for x in k]) == util.canonical(
+            [sup.get(x) for x in k]
+        )
+    # anything else, like pattern or dependencies, only when sub says the same
+    return k in sub and util.canonical(sub[k]) == util.canonical(v)
+
+
+def subsumes(sup, sub):
+    """True when every instance valid for the raveled schema sub is valid for sup."""
+    if sup is True or sub is False:
+        return True
+    if sup is False:
+        return False
+    if sub is True:
+        sub = {}
+    if not compiler.supported(sup) or not compiler.supported(sub):
+        return util.canonical(sup) == util.canonical(sub)
+    # a finite sub is decided one value at a time
+    values = [sub["const"]] if "const" in sub else sub.get("enum")
+    if isinstance(values, list):
+        check = compiler.check(sup)
+        return all(map(check, values))
+    # sub is within the union of its branches, or within any part of its conjunction
+    for k in ("anyOf", "oneOf"):
+        if k in sub and all(subsumes(sup, x) for x in sub[k]):
+            return True
+    if any(subsumes(sup, x) for x in sub.get("allOf", ())):
+        return True
+    return all(keyword(sup, sub, k) for k in compiler.KEYWORDS.intersection(sup))
+
+
+def issubtype(sub, sup):
+    """the remembered structural subtype check between two schemata types. py
+    types, dicts with typed keys and schema without validation keywords only have
+    nominal subtypes."""
+    from .types import Py
+
+    if type.__subclasscheck__(Py, sup) or sup.Keys.forms(sup):
+        return False
+    k = sub.digest(), sup.digest()
+    v = memo.get(k)
+    if v is None:
+        s = sup.schema().ravel()
+        v = memo[k] = bool(compiler.KEYWORDS.intersection(s)) and subsumes(
+            s, sub.schema().ravel()
+        )
+    return v
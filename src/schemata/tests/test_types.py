@@ -1,6 +1,8 @@
 import datetime
 import functools
+import importlib.util
 import operator
+import pickle
 import unittest
 
 import hypothesis
@@ -8,7 +10,7 @@ import jsonpatch
 import pytest
 
 from schemata import *
-from schemata import base, util
+from schemata import base, subsumption, util
 from schemata.util import *
 
 r = raises = pytest.raises(ValidationErrors)
@@ -41,6 +43,387 @@ class SchemaTest(unittest.TestCase):
         assert String[:] is String
         assert base.Plural.type() is base.Plural
 
+    def test_merge(x):
+        assert util.Schema.kinds["anyOf"] is tuple
+        assert util.Schema.kinds["properties"] is dict
+
+        class T(Integer | String):
+            pass
+
+        class U(T):
+            pass
+
+        # merging from the merged bases doesn't repeat inherited branches
+        assert U.schema()["anyOf"] == (Integer, String)
+
+
+class CacheTest(unittest.TestCase):
+    def test_lru(x):
+        c = Lru(2)
+        c["a"], c["b"] = 1, 2
+        assert c.get("a") == 1
+        c["c"] = 3
+        assert "b" not in c and "a" in c and c.get("b") is None
+        assert c.stats() == dict(hits=1, misses=1, evictions=1, size=2, maxsize=2)
+        assert len(c.resize(1)) == 1 and c.evictions == 2
+
+    def test_validators(x):
+        assert Integer.minimum(0).schema().validator() is (
+            Integer + Generic.Minimum[0]
+        ).schema().validator()
+        assert Integer.schema().fingerprint() != Number.schema().fingerprint()
+
+    def test_compile(x):
+        from schemata.compiler import compile
+
+        f = compile(Dict[dict(a=Integer.minimum(0), b=List[String])].schema().ravel())
+        assert f(dict(a=1, b=["x"])) and f(dict(b=[]))
+        assert not f(dict(a=-1)) and not f(dict(a=True)) and not f(dict(b=[1]))
+        assert compile({"enum": [1, [True]]})(1.0)
+        assert not compile({"enum": [1, [True]]})([1])
+        assert compile({"$ref": "#"}) is None
+        with raises:
+            Dict[dict(a=Integer.minimum(0))](a=-1)
+
+    def test_backends(x):
+        t = Integer.minimum(0)
+        assert t.schema().checker("jsonschema") is not t.schema().checker("compiled")
+        with util.backend("jsonschema"):
+            assert util.get_backend() == "jsonschema"
+            with raises:
+                t(-1)
+        assert util.get_backend() == "compiled"
+        assert (t + base.Backend["jsonschema"])(1) == 1
+        assert t.backend("jsonschema").schema().ravel()["backend"] == "jsonschema"
+        with pytest.raises(KeyError):
+            util.set_backend("nope")
+        with pytest.raises(KeyError):
+            base.Backend["nope"]
+        for name in ("fastjsonschema", "jsonschema_rs"):
+            assert (name in util.backends) is bool(importlib.util.find_spec(name))
+        report = t.schema().compare(-1, 0, 1.5, True)
+        assert report["compiled"]["agree"] and report["jsonschema"]["agree"]
+
+    def test_memoize(x):
+        util.set_memoize()
+        try:
+            t = Integer.minimum(3)
+            assert t(5) == 5 and t(5) == 5 and util.results.stats()["hits"]
+            with raises:
+                t(1)
+            assert not t.is_valid(True) and t.is_valid(5)
+        finally:
+            util.set_memoize(False)
+        assert not util.results.stats()["size"]
+
+    def test_fingerprint(x):
+        t = Dict[dict(a=Integer.minimum(0))]
+        assert t.fingerprint() is t.fingerprint() and t == Dict[dict(a=Integer.minimum(0))]
+        assert hash(t) == hash(Dict[dict(a=Integer.minimum(0))]) and t != Dict
+        # callables ravel away but still tell types apart
+        a, b = Integer.default(lambda: 1), Integer.default(lambda: 1)
+        assert a.digest() == b.digest() and a != b
+        # nested forms are flattened after the class is made
+        assert (Integer | String) | Null == Generic.AnyOf[Integer, String, Null]
+
+    def test_interned(x):
+        assert Integer.Minimum[0] is Integer.Minimum[0] and List[Integer] is List[Integer]
+        assert Enum[1] is not Enum[True] and Enum[1] is not Enum[1.0]
+        assert base.interned.stats()["hits"] and base.interned.stats()["live"]
+        # fluent builders are cached on the metaclass and their results interned
+        assert Integer.minimum(0) is Integer.minimum(0) is not Integer.minimum(1)
+        assert isinstance(vars(Generic)["minimum"], base.Fluent)
+        assert String.format is str.format
+
+
+class ManyTest(unittest.TestCase):
+    def test_validate_many(x):
+        t = Integer.minimum(0)
+        assert t.validate_many(iter([1, 2])) == [1, 2]
+        assert t.validate_many([1, -1, "a"], errors="mask") == [True, False, False]
+        e = t.validate_many([1, -1], errors="collect")
+        assert e[0] is None and isinstance(e[1], ValidationErrors)
+        with raises:
+            t.validate_many([1, -1])
+        with pytest.raises(ValueError):
+            t.validate_many([], errors="ignore")
+
+        assert Dict[int, Integer].validate_many([{1: 1}, {"a": 1}], errors="mask") == [
+            True,
+            False,
+        ]
+        assert Json.validate_many([1, "a", []]) == [1, "a", []]
+        assert (String | Integer).validate_many([1, [], "a"], errors="mask") == [
+            True,
+            False,
+            True,
+        ]
+        assert strings.Email.validate_many(["@", ""], errors="mask") == [True, False]
+
+    def test_parallel(x):
+        import concurrent.futures
+
+        t, v = Integer.minimum(0), [1, 2, -1, 3, -2]
+        with concurrent.futures.ThreadPoolExecutor(2) as ex:
+            e = t.validate_many(v, errors="collect", executor=ex, chunksize=2)
+            assert [x and x.path for x in e] == [None, None, (2,), None, (4,)]
+            assert t.validate_many(v, errors="mask", executor=ex) == list(
+                map(t.is_valid, v)
+            )
+            with pytest.raises(exceptions.Error) as e:
+                List[t].validate(v, parallel=True, executor=ex, chunksize=1)
+            assert e.value.path == (2,)
+            assert List.validate(v, parallel=True, executor=ex) == v
+        e = t.validate_many(v, errors="collect", executor="processes")
+        assert pickle.loads(pickle.dumps(e[2])).path == (2,)
+        assert pickle.loads(pickle.dumps(e[2])).args == e[2].args != ()
+        # the error type doesn't depend on the number of workers
+        assert {type(x) for x in t.validate_many(v, errors="collect") if x} == {
+            exceptions.Error
+        }
+        # lists and sets are validated by their schema in the workers too
+        assert List[t].portable() and Set[t].portable()
+        with concurrent.futures.ThreadPoolExecutor(2) as ex:
+            e = List[t].validate_many([[1], [1, -1]], errors="collect", executor=ex)
+        assert e[0] is None and e[1].path == (1, 1)
+
+    def test_async(x):
+        import asyncio
+
+        async def items(v):
+            for x in v:
+                yield x
+
+        async def main():
+            t = Integer.minimum(0)
+            assert await List[t].avalidate([1, 2, 3], chunksize=2) == [1, 2, 3]
+            assert await List.avalidate([1, "a"]) == await Set.avalidate([1, "a"])
+            assert await Enum[[1], [2]].avalidate([1]) == [1]
+            with pytest.raises(exceptions.Error) as e:
+                await List[t].avalidate([1, 2, -3], chunksize=2)
+            assert e.value.path == (2,)
+            with pytest.raises(asyncio.TimeoutError):
+                await List[t].avalidate(list(range(10000)), chunksize=1, timeout=0)
+            assert await Dict[int, Integer].aobject({1: 1}) == {1: 1}
+            v = [x async for x in t.avalidate_stream(items([1, 2, 3]), chunksize=2)]
+            assert v == [1, 2, 3]
+            with pytest.raises(exceptions.Error):
+                [x async for x in t.avalidate_stream(items([1, -2]))]
+
+        # asyncio.run is new in python 3.7
+        loop = asyncio.new_event_loop()
+        try:
+            loop.run_until_complete(main())
+        finally:
+            loop.close()
+
+
+class IsValidTest(unittest.TestCase):
+    def test_branches(x):
+        t = Integer | String | Null
+        for v in ["a"] * 70 + [1]:
+            assert t.is_valid(v)
+        assert t.branches()[str][0] == (String, 70, 0)
+        # the first declared match still wins for AnyOf
+        assert (Number | Integer)(1) == 1 and (Integer | Number)(1.5) == 1.5
+        u = Integer.minimum(0) & Integer.maximum(9)
+        for v in [10] * 70:
+            assert not u.is_valid(v)
+        assert u.branches()[int][0][0] == Integer.maximum(9)
+        assert u(5) == 5
+
+    def test_dispatch(x):
+        # a json value tries only the branches its type or discriminator allows
+        Json.is_valid(None)
+        b = Json.branches()[type(None)]
+        assert sum(h + m for _, h, m in b) == 1 and (Null, 1, 0) in b
+        a = Dict[dict(kind=Const["a"], x=Integer)].required(["kind"])
+        b = Dict[dict(kind=Const["b"], x=String)].required(["kind"])
+        u = a ^ b
+        assert u.is_valid(dict(kind="a", x=1))
+        assert not u.is_valid(dict(kind="b", x=1))
+        # each value was only tried against the branch its kind names
+        assert u.branches()[dict] == [(a, 1, 0), (b, 0, 1)]
+        # required keys with defaults don't rule a branch out
+        c = Dict[dict(kind=Const["c"], y=Integer.default(1))].required(["kind", "y"])
+        assert (c | b)(dict(kind="c")) == dict(kind="c", y=1)
+        assert (c ^ b).is_valid(dict(kind="c"))
+
+    def test_is_valid(x):
+        assert Integer.is_valid(1) and not Integer.is_valid("a")
+        assert Json.is_valid({}) and not Json.is_valid(object())
+        assert (List | Bool).is_valid(True) and not (String & Integer).is_valid(1)
+        assert (-String).is_valid(1) and not (-String).is_valid("a")
+        assert not (Integer ^ Number).is_valid(1) and (Integer ^ Number).is_valid(1.1)
+        t = Dict[int, Integer]
+        assert t.is_valid({1: 1}) and not t.is_valid({"a": 1})
+        assert Py["builtins.range"].is_valid(range(1))
+
+        class Odd(Dict):
+            @classmethod
+            def validate(cls, *args):
+                if len(*args) % 2 == 0:
+                    raise exceptions.ValidationError(f"{args} has even keys")
+                return super().validate(*args)
+
+        assert not Odd.portable() and not isinstance({}, Odd) and Odd.is_valid({1: 1})
+
+        class Short(List):
+            @classmethod
+            def validate(cls, *args):
+                if len(*args) > 1:
+                    raise exceptions.ValidationError(f"{args} is too long")
+                return super().validate(*args)
+
+        assert not Short.portable() and not isinstance([1, 2], Short)
+        # composites still construct values their branches coerce
+        assert ((List | Bool) | List)(True) is True
+        assert (List[Integer] | Null)((1, 2)) == [1, 2]
+        assert (Instance["builtins.range"] | Null)(2) == range(2)
+        # and the defaults of their dict branches
+        a = Dict[dict(a=Integer.default(1))].required(["a"])
+        assert (a | Null)({}) == (a ^ Null)({}) == {"a": 1}
+        assert isinstance({}, a | Null) and isinstance({}, a ^ Null)
+
+
+class IterErrorsTest(unittest.TestCase):
+    def test_iter_errors(x):
+        t = Dict[dict(a=List[Integer.minimum(0)], b=String)].required(["b"])
+        e = list(t.iter_errors(dict(a=[1, -1, "x"])))
+        assert [(x.keyword, x.path) for x in e] == [
+            ("minimum", ("a", 1)),
+            ("type", ("a", 2)),
+            ("required", ()),
+        ]
+        assert str(e[-1]) == "'b' is a required property"
+        assert len(list(t.iter_errors(dict(a=[-1] * 10), max_errors=2))) == 2
+        assert not list(t.iter_errors(dict(b="")))
+        assert len(list(Dict[int, Integer].iter_errors({"a": 1}))) == 1
+
+
+class FormatsTest(unittest.TestCase):
+    def test_formats(x):
+        from schemata import formats
+
+        assert strings.IPv4.is_valid("1.2.3.4") and not strings.IPv4.is_valid("1.2.3")
+        assert strings.IPv6.is_valid("::1") and not strings.IPv6.is_valid("1.2.3.4")
+        assert strings.Email.is_valid("@") and not strings.Email.is_valid("")
+        assert strings.DateTime.is_valid("2020-02-29T10:00:00+01:00")
+        assert not strings.DateTime.is_valid("2019-02-29T10:00:00Z")
+        assert not util.draft7(dict(format="time")).is_valid("25:00:00Z")
+        assert formats.check_many("ipv4", ["1.1.1.1", "x", "1.1.1.1", 1]) == [
+            True,
+            False,
+            True,
+            True,
+        ]
+        assert ("ipv4", "1.1.1.1") in formats.memo
+
+    def test_regex(x):
+        assert util.regex("^a+$") is util.regex("^a+$")
+        assert String.Pattern["^a+$"].Pattern.forms(String.Pattern["^a+$"]) is util.regex(
+            "^a+$"
+        )
+        assert strings.Regex("^b") is util.regex("^b")
+        v = util.draft7(dict(patternProperties={"^a": Integer.schema()}))
+        assert v.is_valid(dict(ab=1, b="x")) and not v.is_valid(dict(ab="x"))
+        assert util.patterns.stats()["hits"]
+
+
+class DeltaTest(unittest.TestCase):
+    def test_list_delta(x):
+        t = List[Integer].uniqueItems(True).maxItems(4).contains(dict(const=3))
+        v = t([3, 1])
+        assert v.append(2) == [3, 1, 2] and v._state[1:] == [3, {1, 2, 3}, 1]
+        for f in (
+            lambda: v.append(1),
+            lambda: v.append("a"),
+            lambda: v.extend([4, 5]),
+            lambda: v.remove(3),
+        ):
+            with pytest.raises(exceptions.ValidationErrors):
+                f()
+        assert v == [3, 1, 2]
+        # errors point at the index the bad element would take
+        for f, k in (
+            (lambda: v.insert(0, "a"), 0),
+            (lambda: v.__setitem__(1, "a"), 1),
+            (lambda: v.__setitem__(slice(2, 3), ["a"]), 2),
+        ):
+            with pytest.raises(exceptions.Error) as e:
+                f()
+            assert e.value.path == (k,)
+        v[1] = 4
+        v[1:3] = [2, 1]
+        assert v == [3, 2, 1]
+        # positional items need the whole list
+        assert List[Integer, String].plan() is None
+        assert List[Integer, String]([1, "a"]).append(2) == [1, "a", 2]
+
+    def test_unique(x):
+        assert util.unique([1, True, "1", [1], {"a": 1}])
+        assert not util.unique([1, 1.0]) and not util.unique([{"a": [1]}, {"a": [1.0]}])
+        v = util.draft7(dict(uniqueItems=True))
+        assert v.is_valid([[1], [True]]) and not v.is_valid([[1], [1.0]])
+        s = Set[Integer]([1, 2])
+        assert 1 in s and 1.0 in s and True not in s and 3 not in s
+        assert 3 in s.append(3)
+        # sets without a plan search the list
+        t = Set[Integer, String]
+        assert 1 in t([1, "a"]) and 2 not in t([1])
+        assert 1 in (Set[Integer] + Generic.MinLength[1])([1, 2])
+
+    def test_dict_delta(x):
+        class T(Dict):
+            w: Float
+            y: Integer
+            x: String
+
+            def y(x: "w"):
+                return int(x["w"])
+
+            def x(x: "y"):
+                return str(x["y"])
+
+        t = T.maxProperties(4).additionalProperties(Integer)(w=1.5)
+        assert T.plan() and t == dict(w=1.5, y=1, x="1")
+        # dependent defaults are recomputed downstream of the changed key
+        t["w"] = 22.0
+        assert t == dict(w=22.0, y=22, x="22")
+        t["a"] = 1
+        for f in (lambda: t.update(b=2), lambda: t.update(a="b"), lambda: t.pop("w")):
+            with pytest.raises(exceptions.ValidationErrors):
+                f()
+        assert t.pop("a") == 1 and t == dict(w=22.0, y=22, x="22")
+
+
+class StreamTest(unittest.TestCase):
+    def test_stream(x):
+        import io
+
+        from schemata import stream
+
+        t = List[Integer.minimum(0)].uniqueItems(True)
+        assert list(t.stream(io.StringIO("[1, 2.0 ,3]"))) == [1, 2.0, 3]
+        s = t.stream(io.StringIO("[1, -1]"))
+        assert next(s) == 1
+        with pytest.raises(exceptions.Error) as e:
+            next(s)
+        assert e.value.path == (1,) and e.value.keyword == "minimum"
+        with pytest.raises(exceptions.Error):
+            list(t.stream(io.StringIO("[1, 1.0]")))
+        u = List.uniqueItems(True)
+        assert len(list(u.stream(io.StringIO("[1, true, [1], [true]]")))) == 4
+        with pytest.raises(exceptions.Error):
+            list(u.stream(io.StringIO('[{"a": [1]}, {"a": [1.0]}]')))
+        # values split across reads are decoded once the window holds them
+        r = stream.Reader(io.StringIO('[12345, 1.5e10, "abcdef", {"a": [1]}]'), 2)
+        assert list(stream.array({}, r)) == [12345, 1.5e10, "abcdef", {"a": [1]}]
+        d = Dict[dict(a=Integer)].required(["b"])
+        assert dict(d.stream(io.StringIO('{"a": 1, "b": null}'))) == dict(a=1, b=None)
+        with pytest.raises(exceptions.Error):
+            list(d.stream(io.StringIO('{"a": 1}')))
+
 
 class BaseTest(unittest.TestCase):
     def test_forward(x):
@@ -114,6 +497,11 @@ class LiteralTest(unittest.TestCase):
 
         assert Enum["a"]("a") == "a"
 
+        # the hashed index keeps json equality
+        n = Enum[0, 1, [2]]
+        assert n.is_valid(1.0) and n.is_valid([2.0]) and not n.is_valid(True)
+        assert E.py() is E.py() and E.choices() is E.choices()
+
         with raises:
             Enum["a"]("b")
 
@@ -207,6 +595,37 @@ class ContainerTest(unittest.TestCase):
         t._q = 8
         assert "_q" not in t and t._q == 8
 
+    def test_construction(x):
+        class T(Dict):
+            a: Integer
+            c: Integer
+            b: Integer
+
+            def c(x: ["b"]):
+                return x["b"] + 1
+
+            def b(x: ["a"]):
+                return x["a"] + 1
+
+        assert [x for x, *_ in T.construction()["computed"]] == ["b", "c"]
+        assert T(a=1) == dict(a=1, b=2, c=3)
+
+        with pytest.raises(ValueError):
+
+            class U(Dict):
+                a: Integer
+                b: Integer
+
+                def a(x: ["b"]):
+                    return 1
+
+                def b(x: ["a"]):
+                    return 1
+
+        # properties given as raw schema or forward strings have no plan to make
+        assert Dict[dict(a={"type": "integer"})](a=1) == dict(a=1)
+        assert Dict[dict(a="builtins.int")].schema()["properties"]["a"] == "builtins.int"
+
     def test_list(x):
         List(List.example())
 
@@ -265,10 +684,10 @@ class ContainerTest(unittest.TestCase):
 
         a[2:4] = reversed(a[2:4])
 
-        assert a == [0, 1, 4, 5, 6, 7, 8, 9]
+        assert a == [0, 1, 3, 2, 4, 5, 6, 7, 8, 9]
 
         del a[2]
-        assert a == [0, 1, 5, 6, 7, 8, 9]
+        assert a == [0, 1, 2, 4, 5, 6, 7, 8, 9]
 
         assert List(list(range(10))).map(lambda x: str(x)) == list(map(str, range(10)))
         v = List[Integer]([-1, -2, 4, 5]).filter(lambda x: x < 0)
@@ -767,8 +1186,21 @@ class ManualTests(unittest.TestCase):
         assert (-String)(1) == 1
         assert (+String) is String
         assert isinstance(Generic.Items.forms(Tuple[[int, str]]), tuple)
-        # this might not be right...
-        assert issubclass(Dict.MinProperties[3], Dict.minProperties(3))
+        # MinProperties[3] admits values that aren't objects
+        assert not issubclass(Dict.MinProperties[3], Dict.minProperties(3))
+        assert issubclass(Dict.minProperties(3), Dict.MinProperties[3])
+        assert issubclass(Integer.exclusiveMinimum(0), Integer.minimum(0))
+        assert not issubclass(Integer, Integer.minimum(0))
+        assert issubclass(Enum["a", "b"], String) and issubclass(Integer | String, Json)
+        assert issubclass(List[Integer.minimum(3)], List[Number])
+        assert issubclass(Dict[dict(a=Integer)].required(["a"]), Dict.required(["a"]))
+        # the true branch overlaps the string, the false branch admits nothing
+        t = {"type": "string"}
+        assert not subsumption.subsumes(dict(oneOf=[t, True]), t)
+        assert subsumption.subsumes(dict(oneOf=[t, False]), t)
+        # types that are only structurally dicts are still validated
+        with raises:
+            (base.Type["object"] + Generic.MinProperties[2])({"a": 1})
         assert Dict.type() is Dict
         assert base.Type.type() is base.Type
         assert base.Type.type() is base.Type
@@ -810,6 +1242,37 @@ def test_if():
         If[Integer::String](1.1)
 
     assert If[Integer::String](1) == 1
+    # types that parse their input are constructed rather than only checked
+    assert If[Uuid::String]("bad") == "bad" and Not[Uuid]("bad") == "bad"
+    assert isinstance(If[Uuid::String](str(Uuid())), Uuid)
+
+
+def test_numpy():
+    import array
+
+    numpy = pytest.importorskip("numpy")
+    t = List[Integer.minimum(0).maximum(255)]
+    a = numpy.arange(256)
+    assert t.validate(a) is a
+    assert t(a) == list(range(256)) and type(t(a)[0]) is int
+    a[[3, 7]] = 256
+    with raises as e:
+        t.validate(a)
+    assert list(e.value.indices) == [3, 7]
+    with raises:
+        t.validate(numpy.array([0.5]))
+    with raises:
+        t.validate(numpy.array([True]))
+    assert t.validate(numpy.array([1.0])) is not None
+    assert t.validate(numpy.array([], dtype=bool)).size == 0
+    assert t.is_valid(a[:3]) and isinstance(a[:3], t) and not t.is_valid(a)
+    assert t.validate_many([a, a[:3], [1]], errors="mask") == [False, True, True]
+    with raises as e:
+        Set[Number].validate(numpy.array([1, 2, 1.0]))
+    assert list(e.value.indices) == [2]
+    with raises:
+        t.minItems(2).validate(array.array("i", [1]))
+    assert List[String].validate(numpy.array(["a"]))
 
 
 def test_file(pytester):
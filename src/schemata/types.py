@@ -7,8 +7,9 @@ import sys
 import typing
 import uuid
 
-from . import base, exceptions, mediatypes, util
+from . import base, compiler, exceptions, mediatypes, util
 from .base import Const, Default, Generic
+from .compat.numpy import is_array
 
 
 class Null(base.Literal, base.Type["null"]):
@@ -47,30 +48,108 @@ class Integer(base.Literal, base.Type["integer"], int):
     pass
 
 
+# the array and object keywords that mutations check one element at a time
+DELTA = {"type", "items", "minItems", "maxItems", "uniqueItems", "contains"}
+OBJECT = {
+    "type",
+    "properties",
+    "patternProperties",
+    "additionalProperties",
+    "propertyNames",
+    "required",
+    "minProperties",
+    "maxProperties",
+    "dependencies",
+}
+# the plans of each kind are cached apart, a list and a dict type may share a digest
+array_plans, object_plans = util.Lru(256), util.Lru(256)
+
+
 class List(base.Literal, base.Type["array"], list):
     def object(cls, *args):
         if args:
             if isinstance(*args, (set, tuple)):
                 args = (list(*args),)
+            elif is_array(*args):
+                # arrays are validated with vectorized operations before the copy
+                self = list.__new__(cls)
+                list.__init__(self, cls.validate(*args).tolist())
+                return self
         return cls.validate(super().object(*args))
 
+    def validate(cls, *args, parallel=False, executor="processes", chunksize=None):
+        if args and is_array(*args):
+            from .compat.numpy import validate
+
+            return validate(cls, *args)
+        p = parallel and args and cls.plan()
+        if p and isinstance(p["items"], dict):
+            # the items are checked by the workers, the rest of the schema by us.
+            # lists that take any items have nothing to hand out.
+            from .parallel import validate_many
+
+            validate_many(p["items"], *args, "raise", executor, chunksize)
+            s = cls.schema().ravel()
+            s.pop("items", None)
+            util.Schema.validate(s, *args)
+            return args[0]
+        return super().validate(*args)
+
+    def is_valid(cls, *args):
+        if not cls.portable():
+            # a validate of their own is only asked through its exceptions
+            return super().is_valid(*args)
+        if args and is_array(*args):
+            try:
+                cls.validate(*args)
+            except exceptions.ValidationErrors:
+                return False
+            return True
+        return cls.schema().checker(key=cls.digest())(*args)
+
+    @classmethod
+    def validate_many(cls, iterable, *, errors="raise", executor=None, chunksize=None):
+        # arrays take the vectorized path of validate, one at a time, rather than
+        # the schema
+        items = list(iterable)
+        if errors in {"raise", "collect", "mask"} and any(map(is_array, items)):
+            return base.validate_each(cls, items, errors)
+        return Generic.validate_many(
+            cls, items, errors=errors, executor=executor, chunksize=chunksize
+        )
+
+    @classmethod
+    def portable(cls):
+        # the array and parallel paths of List.validate still only ask the schema
+        return getattr(cls.validate, "__func__", None) is List.validate.__func__
+
     def type(cls, x):
         return cls + cls.Items[x]
 
+    @classmethod
+    def stream(cls, file):
+        """yield the valid elements of a json array too large to load at once."""
+        from . import stream
+
+        return stream.array(cls.schema(), file)
+
     # fluent list api
     def append(self, object):
         return self.extend((object,))
 
     def extend(self, args=None):
-        self + (args or [])
-        list.extend(self, args or [])
+        args = list(args or [])
+        if not self._delta(args):
+            self + args
+        list.extend(self, args)
         return self
 
     def insert(self, id, value):
         if id < 0:
             id += len(self)
 
-        self.validate(self[:id] + [value] + self[id:])
+        if not self._delta([value], at=(min(max(id, 0), len(self)),)):
+            self.validate(self[:id] + [value] + self[id:])
         list.insert(self, id, value)
 
         return self
@@ -78,7 +157,8 @@ class List(base.Literal, base.Type["array"], list):
     def pop(self, id=-1):
         if id == -1:
             id = len(self) - 1
-        self.validate(self[:id] + self[id + 1 :])
+        if not self._delta((), [self[id]]):
+            self.validate(self[:id] + self[id + 1 :])
         return list.pop(self, id)
 
     def remove(self, value):
@@ -90,13 +170,91 @@ class List(base.Literal, base.Type["array"], list):
             if key < 0:
                 key += len(self)
         if isinstance(key, slice):
-            x = list(self)
-            x[key] = value
-            self.validate(x)
-        else:
-            self.validate(self[: key - 1] + [value] + self[key + 1 :])
+            value = list(value)
+            r = range(len(self))[key]
+            if r.step == 1:
+                r = range(r.start, r.start + len(value))
+            if not self._delta(value, self[key], r):
+                x = list(self)
+                x[key] = value
+                self.validate(x)
+        elif not self._delta([value], [self[key]], (key,)):
+            self.validate(self[:key] + [value] + self[key + 1 :])
         return list.__setitem__(self, key, value)
 
+    @classmethod
+    def plan(cls):
+        """the array keywords that can be checked one element at a time, None when
+        the schema needs the whole list like positional items or composites."""
+        k = cls.digest()
+        plan = array_plans.get(k, False)
+        if plan is False:
+            s = cls.schema().ravel()
+            items = s.get("items", True)
+            if compiler.KEYWORDS.intersection(s) - DELTA or isinstance(items, list):
+                plan = None
+            else:
+                plan = dict(
+                    items=items,
+                    check=compiler.check(items),
+                    contains="contains" in s and compiler.check(s["contains"]),
+                    schema=s.get("contains"),
+                    unique=s.get("uniqueItems", False),
+                    min=s.get("minItems", 0),
+                    max=s.get("maxItems"),
+                )
+            array_plans[k] = plan
+        return plan
+
+    def _delta(self, added=(), removed=(), at=None):
+        # validate a change from the elements it adds and removes rather than the
+        # whole list. at holds the indices of the added elements, they are
+        # appended otherwise.
+        p = type(self).plan()
+        if p is None:
+            return False
+        n = len(self) + len(added) - len(removed)
+        if n < p["min"]:
+            raise exceptions.Error(n, "minItems", p["min"], (), ("minItems",))
+        if p["max"] is not None and n > p["max"]:
+            raise exceptions.Error(n, "maxItems", p["max"], (), ("maxItems",))
+        for i, x in enumerate(added):
+            if not p["check"](x):
+                k = len(self) + i if at is None else at[i]
+                raise compiler.error(p["items"], x, (k,))
+
+        try:
+            state = self._index(p)
+            new = list(map(util.canonical, added)) if p["unique"] else []
+            old = set(map(util.canonical, removed)) if p["unique"] else set()
+        except TypeError:
+            return False
+
+        if len(set(new)) < len(new) or any(k in state[2] and k not in old for k in new):
+            raise exceptions.Error(added, "uniqueItems", True, (), ("uniqueItems",))
+        found = state[3]
+        if p["contains"]:
+            found += sum(map(p["contains"], added)) - sum(map(p["contains"], removed))
+            if not found:
+                raise exceptions.Error([], "contains", p["schema"], (), ("contains",))
+        state[2].difference_update(old)
+        state[2].update(new)
+        state[1], state[3] = n, found
+        return True
+
+    def _index(self, p):
+        # the uniqueItems keys and contains count of the elements, kept on the
+        # instance and rebuilt when the list changed without the mutators.
+        state = self.__dict__.get("_state")
+        if state is None or state[:2] != [id(self), len(self)]:
+            state = [id(self), len(self), set(), 0]
+            if p["unique"]:
+                state[2] = set(map(util.canonical, self))
+            if p["contains"]:
+                state[3] = sum(map(p["contains"], self))
+            self._state = state
+        return state
+
     __iadd__ = extend
 
     def __add__(self, object):
@@ -164,6 +322,9 @@ class Py(base.Value):
             return args
         raise exceptions.ValidationError(f"{args} is not an object of {cls}")
 
+    def is_valid(cls, *args):
+        return isinstance(*args, cls.Py.object.__func__(cls))
+
     def object(cls):
         return util.forward_strings(*cls.Value.forms(cls)[:1])[0]
 
@@ -257,8 +418,11 @@ class Dict(base.Type["object"], dict, base.UpdateDisplay):
 
     def update(self, *args, **kwargs):
         kwargs = dict(*args, **kwargs)
-        r = type(self).Required.forms(self) or ()
-        x = self.force_update(type(self).object(**{**self, **kwargs}))
+        new = self._delta(kwargs)
+        if new is None:
+            x = self.force_update(type(self).object(**{**self, **kwargs}))
+        else:
+            x = self.force_update(new)
         with util.suppress(AttributeError):
             x._update_display()
 
@@ -273,43 +437,198 @@ class Dict(base.Type["object"], dict, base.UpdateDisplay):
             v = self[key]
         except KeyError:
             return default
-        self.validate({k: v for k, v in self.items() if k != key})
+        p = type(self).plan()
+        if p is None:
+            self.validate({k: v for k, v in self.items() if k != key})
+        elif key in self:
+            # only the constraints that mention the key can break
+            if key in p["required"]:
+                raise exceptions.Error(self, "required", key, (), ("required",))
+            n = len(self) - 1
+            if n < p["min"]:
+                path = ("minProperties",)
+                raise exceptions.Error(n, "minProperties", p["min"], (), path)
+            for x in p["dependents"].get(key, ()):
+                if x in self:
+                    path = "dependencies", x
+                    raise exceptions.Error(self, "dependencies", key, (), path)
         try:
             return dict.pop(self, key, default)
         finally:
             with util.suppress(AttributeError):
                 self._update_display()
 
+    @classmethod
+    def plan(cls):
+        """the object keywords that can be checked one property at a time, None when
+        the schema needs the whole mapping like composites."""
+        k = cls.digest()
+        plan = object_plans.get(k, False)
+        if plan is False:
+            s = cls.schema().ravel()
+            plan, dependencies = None, s.get("dependencies", {})
+            if not compiler.KEYWORDS.intersection(s) - OBJECT and all(
+                isinstance(x, list) for x in dependencies.values()
+            ):
+                properties = s.get("properties", {})
+                extra, names = (
+                    s.get("additionalProperties", True),
+                    s.get("propertyNames", True),
+                )
+                plan = dict(
+                    properties={
+                        k: (v, compiler.check(v)) for k, v in properties.items()
+                    },
+                    patterns=[
+                        (util.regex(k), v, compiler.check(v))
+                        for k, v in s.get("patternProperties", {}).items()
+                    ],
+                    extra=(extra, compiler.check(extra)),
+                    names=(names, compiler.check(names)),
+                    required=set(s.get("required", ())),
+                    min=s.get("minProperties", 0),
+                    max=s.get("maxProperties"),
+                    dependencies=dependencies,
+                    dependents={},
+                    defaults={
+                        k: v["default"]
+                        for k, v in properties.items()
+                        if isinstance(v, dict) and "default" in v
+                        if k not in dependencies
+                    },
+                )
+                for x, v in dependencies.items():
+                    for u in v:
+                        plan["dependents"].setdefault(u, []).append(x)
+            object_plans[k] = plan
+        return plan
+
+    def _delta(self, changes):
+        # validate an update from the keys it changes rather than the whole mapping,
+        # None when the type needs a full rebuild.
+        cls = type(self)
+        p = cls.plan()
+        if p is None or type.__subclasscheck__(cls.Default, cls):
+            return None
+        new = dict(changes)
+        for k, v in p["defaults"].items():
+            if k not in new and k not in self:
+                new[k] = v
+        if p["dependencies"]:
+            new = self._dependents(new)
+
+        keys, n = cls.Keys.forms(cls), len(self)
+        for k, v in new.items():
+            if keys and not isinstance(k, keys):
+                raise exceptions.ValidationError(f"not all keys are objects of {keys}")
+            t, check = p["names"]
+            if not check(k):
+                raise compiler.error(t, k, (k,))
+            matched = [(t, check) for r, t, check in p["patterns"] if r.search(k)]
+            if k in p["properties"]:
+                matched.append(p["properties"][k])
+            for t, check in matched or [p["extra"]]:
+                if not check(v):
+                    raise compiler.error(t, v, (k,))
+            for u in p["dependencies"].get(k, ()):
+                if u not in new and u not in self:
+                    path = "dependencies", k
+                    raise exceptions.Error(self, "dependencies", u, (), path)
+            n += k not in self
+        if p["max"] is not None and n > p["max"]:
+            raise exceptions.Error(n, "maxProperties", p["max"], (), ("maxProperties",))
+        return new
+
+    def _dependents(self, new):
+        # recompute the callable defaults downstream of the changed keys, each after
+        # the defaults it depends on.
+        cls = type(self)
+        d = dict(cls.Dependencies.forms(cls))
+        stale, changed = [], set(new)
+        while True:
+            more = [
+                x
+                for x, v in d.items()
+                if x not in stale and (x in new or changed.intersection(v))
+            ]
+            if not more:
+                break
+            stale += more
+            changed.update(more)
+        if not stale:
+            return new
+
+        view = dict.__new__(cls)
+        dict.update(view, self)
+        dict.update(view, new)
+        # defaults waiting on a missing key, or on one that waits, keep their value
+        blocked = {x for x in stale if x not in cls.construction()["callables"]}
+        for x, v, f in cls.construction()["computed"]:
+            if x not in stale:
+                continue
+            if blocked.intersection(v) or not all(u in view for u in v):
+                blocked.add(x)
+                continue
+            new[x] = f(view)
+            dict.__setitem__(view, x, new[x])
+        return new
+
+    @classmethod
+    def construction(cls):
+        """the defaults an instance is built with, the static defaults and the
+        callable defaults in dependency order. Generic computes the plan when the
+        class is created so a cycle between callable defaults fails early."""
+        c = cls.__dict__.get("_construction")
+        if c is None:
+            p, d = cls.Properties.forms(cls), dict(cls.Dependencies.forms(cls))
+            static, callables = [], {}
+            for k, v in p.items():
+                # raw schema and forward strings have no defaults
+                if not isinstance(v, type):
+                    continue
+                if k in d:
+                    f = cls.Default.forms(v)
+                    if callable(f):
+                        callables[k] = tuple(d[k]), f
+                elif type.__subclasscheck__(cls.Default, v):
+                    static.append((k, cls.Default.forms(v)))
+
+            # a depth first topological sort, the path names a cycle
+            computed, state = [], {}
+
+            def visit(x, path):
+                if state.get(x) == "visiting":
+                    cycle = " -> ".join(path[path.index(x) :] + (x,))
+                    raise ValueError(f"the defaults of {cls.__name__} form a cycle {cycle}")
+                if x not in state:
+                    state[x] = "visiting"
+                    for u in callables[x][0]:
+                        if u in callables:
+                            visit(u, path + (x,))
+                    state[x] = "visited"
+                    computed.append((x, *callables[x]))
+
+            for x in callables:
+                visit(x, ())
+            c = dict(static=static, computed=computed, callables=callables)
+            type.__setattr__(cls, "_construction", c)
+        return c
+
     @classmethod
     def object(cls, *args, **kwargs):
         if not args or kwargs:
-            if issubclass(cls, cls.Default):
+            if type.__subclasscheck__(cls.Default, cls):
                 return super().object()
         if not all(isinstance(x, dict) for x in args):
             raise exceptions.ValidationError
         kwargs = super().object(dict(*args, **kwargs))
-        p, d, r = (
-            cls.Properties.forms(cls),
-            dict(cls.Dependencies.forms(cls)),
-            cls.Required.forms(cls),
-        )
-        for k, v in p.items():
-            if k in d:
-                continue
-
-            if k not in kwargs and issubclass(v, cls.Default):
-                kwargs.force_update({k: cls.Default.forms(v)})
-
-        while d:
-            for x in list(d):
-                if all(x in kwargs for x in d[x]):
-                    v = cls.Default.forms(cls.Properties.forms(cls)[x])
-
-                    kwargs.force_update({x: v(kwargs)})
-                    d.pop(x)
-                    break
-            else:
-                break
+        c = cls.construction()
+        for k, v in c["static"]:
+            if k not in kwargs:
+                kwargs.force_update({k: v})
+        for x, v, f in c["computed"]:
+            if all(u in kwargs for u in v):
+                kwargs.force_update({x: f(kwargs)})
 
         return cls.validate(kwargs)
 
@@ -324,6 +643,33 @@ class Dict(base.Type["object"], dict, base.UpdateDisplay):
                     raise exceptions.ValidationError(f"not all keys are objects of {k}")
         return args[0] if args else dict()
 
+    @classmethod
+    def portable(cls):
+        if cls.validate.__func__ is not Dict.validate.__func__:
+            return False
+        return not cls.Keys.forms(cls)
+
+    @classmethod
+    def is_valid(cls, *args):
+        if cls.validate.__func__ is not Dict.validate.__func__:
+            # a validate of their own is only asked through its exceptions
+            return super().is_valid(*args)
+        k = cls.Keys.forms(cls)
+        if not cls.schema().checker(key=cls.digest())(*args):
+            return False
+        return not k or all(isinstance(x, k) for x in list(*args))
+
+    @classmethod
+    def stream(cls, file):
+        """yield the valid key, value pairs of a json object too large to load."""
+        from . import stream
+
+        k = cls.Keys.forms(cls)
+        for x in stream.object(cls.schema(), file):
+            if k and not isinstance(x[0], k):
+                raise exceptions.ValidationError(f"{x[0]!r} is not an object of {k}")
+            yield x
+
     @classmethod
     def type(cls, *args):
         if not args:
@@ -332,7 +678,7 @@ class Dict(base.Type["object"], dict, base.UpdateDisplay):
         if isinstance(x, dict):
             return cls.properties(x)
 
-        if isinstance(x, type) and issubclass(x, cls.ContentMediaType):
+        if isinstance(x, type) and type.__subclasscheck__(cls.ContentMediaType, x):
             return cls + x
         if isinstance(x, tuple):
             if len(x) <= 2:
@@ -417,6 +763,15 @@ class File(Dir):
 
         return self.read_text()
 
+    def stream(self, cls=None):
+        """iterate over the elements of a json array, or the items of an object,
+        validating each one as it is parsed."""
+        from . import stream
+
+        if cls is None:
+            return stream.iterate({}, self)
+        return cls.stream(self)
+
 
 class Enum(base.Plural, base.Type):
     def object(cls, *args, **kwargs):
@@ -424,17 +779,54 @@ class Enum(base.Plural, base.Type):
         # cls._attach_parent(self)
         return super().object(cls.validate(args[0] if args else Enum.forms(cls)[0]))
 
+    def validate(cls, *args):
+        m = cls.members()
+        if m["plain"] and len(args) == 1:
+            x, *_ = args
+            if util.member(x, m["index"], m["forms"]):
+                return x
+            raise exceptions.Error(x, "enum", list(m["forms"]), (), ("enum",))
+        return super().validate(*args)
+
+    def is_valid(cls, *args):
+        # enums that only constrain their members look them up in a hashed index
+        m = cls.members()
+        if m["plain"] and len(args) == 1:
+            return util.member(*args, m["index"], m["forms"])
+        return super().is_valid(*args)
+
+    @classmethod
+    def portable(cls):
+        return True
+
     def py(cls):
-        forms = Enum.forms(cls)
-        return enum.Enum(cls.__name__, dict(zip(forms, forms)))
+        m = cls.members()
+        if m["py"] is None:
+            m["py"] = enum.Enum(cls.__name__, dict(zip(m["forms"], m["forms"])))
+        return m["py"]
+
+    @classmethod
+    def members(cls):
+        # the members, their canonical index and the python enum, once per class
+        m = cls.__dict__.get("_members")
+        if m is None:
+            forms = tuple(Enum.forms(cls))
+            s = cls.schema().ravel()
+            m = dict(forms=forms, index=None, plain=False, py=None, choices=forms)
+            if len(forms) == 1 and isinstance(forms[0], dict):
+                # Enum is defined as a plural form
+                m["choices"] = tuple(*forms)
+            with util.suppress(TypeError):
+                m["index"] = frozenset(map(util.canonical, forms))
+                m["plain"] = s.get("enum") == list(forms) and not (
+                    compiler.KEYWORDS.intersection(s) - {"enum"}
+                )
+            type.__setattr__(cls, "_members", m)
+        return m
 
     @classmethod
     def choices(cls):
-        e = Enum.forms(cls)
-        if len(e) is 1 and isinstance(e[0], dict):
-            # Enum is defined as a plural form
-            return tuple(*e)
-        return e
+        return cls.members()["choices"]
 
 
 Enum.register(enum.Enum)
@@ -448,9 +840,199 @@ class Cycler(Enum):
         return __import__("itertools").cycle(cls.choices())
 
 
+_json = (type(None), bool, int, float, str, list, dict)
+_plain = {base.Form.object.__func__, List.object.__func__, Enum.object.__func__}
+
+
+def _conclusive(t, *args, **kwargs):
+    # is_valid predicts construction for portable types whose object methods only
+    # validate, others parse or call python and may fail where the schema passes.
+    return (
+        isinstance(t, Generic)
+        and len(args) == 1
+        and not kwargs
+        and isinstance(*args, _json)
+        and _decides(t)
+    )
+
+
+def _decides(t):
+    # remembered on each class like its fingerprints
+    d = t.__dict__.get("_decides")
+    if d is None:
+        f = getattr(t.object, "__func__", None)
+        if f is Dict.object.__func__:
+            # defaults can complete a value the schema alone rejects
+            c = t.construction()
+            d = not (c["static"] or c["computed"])
+        else:
+            d = f in _plain
+        d = d and t.portable()
+        type.__setattr__(t, "_decides", d)
+    return d
+
+
+def _matches(t, *args, **kwargs):
+    # the exception free composite branch check
+    if _conclusive(t, *args, **kwargs):
+        return t.is_valid(*args)
+    try:
+        util.call(t, *args, **kwargs)
+    except exceptions.ValidationErrors:
+        return False
+    return True
+
+
+def _attempt(t, *args, **kwargs):
+    # construct a composite branch, the flag is False when the branch does not match
+    if _conclusive(t, *args, **kwargs) and not t.is_valid(*args):
+        return None, False
+    try:
+        return util.call(t, *args, **kwargs), True
+    except exceptions.ValidationErrors:
+        return None, False
+
+
+class Branches:
+    # hit and miss counts of each composite branch per python type of the input.
+    # every period records the order is sorted again, likely matches first or,
+    # for AllOf, likely failures first. ties keep the declared order.
+    period = 64
+
+    def __init__(self, forms, failures=False):
+        self.forms, self.failures, self.types = forms, failures, {}
+        self.n = len(forms)
+
+    def entry(self, t):
+        e = self.types.get(t)
+        if e is None:
+            n = self.n
+            e = self.types[t] = dict(hits=[0] * n, misses=[0] * n, order=range(n))
+        return e
+
+    def order(self, t):
+        return self.entry(t)["order"]
+
+    def record(self, t, i, ok):
+        e = self.entry(t)
+        (e["hits"] if ok else e["misses"])[i] += 1
+        if not sum(e["hits"] + e["misses"]) % self.period:
+            hits, misses = e["hits"], e["misses"]
+
+            def rate(i):
+                r = (hits[i] + 1) / (hits[i] + misses[i] + 2)
+                return r if self.failures else -r
+
+            e["order"] = sorted(range(self.n), key=rate)
+
+
+def _branches(cls, forms, failures=False):
+    # the branch statistics live on the composite class itself
+    b = cls.__dict__.get("_branches")
+    if b is None or b.n != len(forms):
+        b = Branches(forms, failures)
+        type.__setattr__(cls, "_branches", b)
+    return b
+
+
+def _kind(*args):
+    return type(args[0]) if len(args) == 1 else None
+
+
+# the json types a python value can have, floats may be integers
+_types = {
+    type(None): {"null"},
+    bool: {"boolean"},
+    int: {"integer", "number"},
+    float: {"number", "integer"},
+    str: {"string"},
+    list: {"array"},
+    dict: {"object"},
+}
+
+
+class Dispatch:
+    # the branches of a union that can match a json value. branches are told apart
+    # by their type, their required keys, and required properties with a const or
+    # an enum. a branch we can't read, like a py type, is always a candidate. keys
+    # a dict fills in with its defaults are never required of the arguments.
+    def __init__(self, forms):
+        self.forms, self.n = forms, len(forms)
+        self.kinds, self.required, self.values, self.open = [], [], {}, {}
+        for i, f in enumerate(forms):
+            s, defaults = {}, set()
+            if isinstance(f, Generic) and not type.__subclasscheck__(Py, f):
+                s = f.schema().ravel()
+                if type.__subclasscheck__(Dict, f):
+                    c = f.construction()
+                    defaults = {k for k, _ in c["static"]} | set(c["callables"])
+            t = s.get("type")
+            self.kinds.append({t} if isinstance(t, str) else set(t) if t else None)
+            self.required.append(frozenset(s.get("required", ())) - defaults)
+            for k, v in s.get("properties", {}).items():
+                if k in self.required[i] and isinstance(v, dict):
+                    values = [v["const"]] if "const" in v else v.get("enum")
+                    for x in values if isinstance(values, list) else ():
+                        with util.suppress(TypeError):
+                            self.values.setdefault(k, {}).setdefault(
+                                util.canonical(x), set()
+                            ).add(i)
+        for k in self.values:
+            found = set().union(*self.values[k].values())
+            self.open[k] = set(range(self.n)) - found
+        self.types = {}
+
+    def kind(self, t):
+        # the candidates for a python type, subclasses map to their json base
+        c = self.types.get(t)
+        if c is None:
+            json = next((_types[b] for b in t.__mro__ if b in _types), None)
+            c = self.types[t] = [
+                i
+                for i, k in enumerate(self.kinds)
+                if json is None or k is None or k & json
+            ]
+        return c
+
+    def __call__(self, *args, **kwargs):
+        # the candidate branches for arguments in the declared order, all of them
+        # when the call isn't a single json value.
+        if len(args) != 1 or kwargs or not isinstance(*args, _json):
+            return range(self.n)
+        x, *_ = args
+        c = self.kind(type(x))
+        if isinstance(x, dict) and len(c) > 1:
+            keep = set(c)
+            try:
+                for k, table in self.values.items():
+                    keep &= table.get(util.canonical(x.get(k)), set()) | self.open[k]
+            except TypeError:
+                pass
+            c = [i for i in c if i in keep and self.required[i].issubset(x)]
+        return c
+
+
+def _dispatch(cls, forms):
+    d = cls.__dict__.get("_dispatch")
+    if d is None or d.n != len(forms):
+        d = Dispatch(forms)
+        type.__setattr__(cls, "_dispatch", d)
+    return d
+
+
 class Composite:
     """a schemaless form type mixin, the name of the class is used to derive others"""
 
+    @classmethod
+    def branches(cls):
+        """the order branches are tried in for each python type of input, with the
+        hits and misses of each branch."""
+        b = cls.__dict__.get("_branches")
+        return {
+            t: [(b.forms[i], e["hits"][i], e["misses"][i]) for i in e["order"]]
+            for t, e in (b.types.items() if b else ())
+        }
+
     @classmethod
     def validate(cls, object):
         # composites use the object creation for typing checking
@@ -466,61 +1048,106 @@ class Composite:
 
 class AnyOf(Composite, base.Form.Nested):
     def object(cls, *args):
+        # the first declared match is the result, so the order stays declared
         args = super().object(*args)
-        ts = AnyOf.forms(cls)
-        for t in ts:
-            try:
-                x = util.call(t, *args)
+        forms, t = AnyOf.forms(cls), _kind(*args)
+        b = _branches(cls, forms)
+        for i in _dispatch(cls, forms)(*args):
+            x, ok = _attempt(forms[i], *args)
+            b.record(t, i, ok)
+            if ok:
                 return cls._attach_parent(x)
-            except exceptions.ValidationErrors + (ValueError,):
-                if t is ts[-1]:
-                    raise exceptions.ValidationError()
+        raise exceptions.ValidationError(f"{args} is not any of {cls}")
+
+    def is_valid(cls, *args):
+        forms, t = AnyOf.forms(cls), _kind(*args)
+        b, c = _branches(cls, forms), _dispatch(cls, forms)(*args)
+        for i in b.order(t):
+            if i not in c:
+                continue
+            ok = _matches(forms[i], *args)
+            b.record(t, i, ok)
+            if ok:
+                return True
+        return False
 
 
 class AllOf(Composite, base.Form.Nested):
     def object(cls, *args):
+        # the likely failure runs first, the value is still the first branch's
         args = super().object(*args)
-        result = {}
-        for t in AllOf.forms(cls):
-            result.setdefault("x", util.call(t, *args))
-
-        x = result.get("x", args[0])
+        forms, t = AllOf.forms(cls), _kind(*args)
+        b, x = _branches(cls, forms, True), args[0]
+        for i in b.order(t):
+            try:
+                v = util.call(forms[i], *args)
+            except exceptions.ValidationErrors:
+                b.record(t, i, False)
+                raise
+            b.record(t, i, True)
+            if not i:
+                x = v
 
         return cls._attach_parent(x)
 
+    def is_valid(cls, *args):
+        forms, t = AllOf.forms(cls), _kind(*args)
+        b = _branches(cls, forms, True)
+        for i in b.order(t):
+            ok = _matches(forms[i], *args)
+            b.record(t, i, ok)
+            if not ok:
+                return False
+        return True
+
 
 class OneOf(Composite, base.Form.Nested):
     def object(cls, *args, **kwargs):
+        # any order finds the same single match, the likely one is tried first
         args = super().object(*args)
-        i, x = 0, None
-        for t in OneOf.forms(cls):
-            try:
-                if i:
-                    util.call(t, *args, **kwargs)
-                else:
-                    x = util.call(t, *args, **kwargs)
-
-                i += 1
-            except exceptions.ValidationErrors as e:
+        forms, t = OneOf.forms(cls), _kind(*args)
+        b, n, x = _branches(cls, forms), 0, None
+        c = _dispatch(cls, forms)(*args, **kwargs)
+        for i in b.order(t):
+            if i not in c:
                 continue
-            if i > 1:
+            if n:
+                ok = _matches(forms[i], *args, **kwargs)
+            else:
+                x, ok = _attempt(forms[i], *args, **kwargs)
+            b.record(t, i, ok)
+            n += ok
+            if n > 1:
                 break
 
-        if i == 1:
+        if n == 1:
             return cls._attach_parent(x)
 
-        raise exceptions.ValidationError()
+        raise exceptions.ValidationError(f"{args} is not exactly one of {cls}")
+
+    def is_valid(cls, *args):
+        forms, t = OneOf.forms(cls), _kind(*args)
+        b, n, c = _branches(cls, forms), 0, _dispatch(cls, forms)(*args)
+        for i in b.order(t):
+            if i not in c:
+                continue
+            ok = _matches(forms[i], *args)
+            b.record(t, i, ok)
+            n += ok
+            if n > 1:
+                break
+        return n == 1
 
 
 class Not(Composite, base.Form):
     def object(cls, *args):
-        try:
-            cls.forms(cls)(*args)
-        except exceptions.ValidationErrors:
-            x, *_ = args
+        if _matches(cls.forms(cls), *args):
+            raise exceptions.ValidationError(f"{args} is an object of {cls}")
+        x, *_ = args
+        return cls._attach_parent(x)
 
-            return cls._attach_parent(x)
-        raise exceptions.ValidationError
+    def is_valid(cls, *args):
+        return not _matches(cls.forms(cls), *args)
 
 
 class Else(base.Form):
@@ -533,16 +1160,15 @@ class Then(base.Form):
 
 class If(base.Form):
     def object(cls, *args):
-        try:
+        if _matches(If.forms(cls), *args):
             args = (If.forms(cls)(*args),)
             t = Then.forms(cls)
             if t:
                 return t(*args)
             return args[0]
-        except exceptions.ValidationErrors as exc:
-            e = Else.forms(cls)
-            if e:
-                return e(*args)
+        e = Else.forms(cls)
+        if e:
+            return e(*args)
 
     def type(cls, object):
         if isinstance(object, slice):
@@ -590,6 +1216,17 @@ class Set(List, base.Form.Title["Set"], base.Form.UniqueItems[True]):
             return typing.Set
         return typing.Set[v]
 
+    def __contains__(self, x):
+        # membership is a lookup in the uniqueItems index, with json equality.
+        # sets without a plan, like positional items, search the list.
+        p = type(self).plan()
+        if p is None or not p["unique"]:
+            return list.__contains__(self, x)
+        try:
+            return util.canonical(x) in self._index(p)[2]
+        except TypeError:
+            return list.__contains__(self, x)
+
 
 Set.register(set)
 
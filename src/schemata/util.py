@@ -13,11 +13,28 @@ __all__ = (
     "Forward",
     "suppress",
     "Path",
+    "Lru",
+    "canonical",
+    "unique",
+    "member",
+    "regex",
+    "backend",
+    "register_backend",
+    "set_backend",
+    "set_memoize",
 )
 
+import collections
+import contextlib
 import functools
+import hashlib
+import importlib.util
 import inspect
+import json
+import re
 import sys
+import threading
+import time
 import typing
 from contextlib import suppress
 
@@ -126,7 +143,327 @@ def lowercased(x):
     return x[0].lower() + x[1:] if x else x
 
 
+class Lru:
+    # a bounded, thread safe mapping that evicts the least recently used entries.
+    # the counters make it possible to tell if a cache is earning its keep.
+    def __init__(self, maxsize=128):
+        self.data, self.maxsize = collections.OrderedDict(), maxsize
+        self.lock = threading.RLock()
+        self.hits = self.misses = self.evictions = 0
+
+    def __len__(self):
+        return len(self.data)
+
+    def __contains__(self, key):
+        return key in self.data
+
+    def get(self, key, default=None):
+        with self.lock:
+            try:
+                value = self.data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self.hits += 1
+            self.data.move_to_end(key)
+            return value
+
+    def __setitem__(self, key, value):
+        with self.lock:
+            self.data[key] = value
+            self.data.move_to_end(key)
+            self.resize(self.maxsize)
+
+    def resize(self, maxsize):
+        # a maxsize of None is unbounded
+        with self.lock:
+            self.maxsize = maxsize
+            while maxsize is not None and len(self.data) > max(maxsize, 0):
+                self.data.popitem(last=False)
+                self.evictions += 1
+        return self
+
+    def clear(self):
+        with self.lock:
+            self.data.clear()
+            self.hits = self.misses = self.evictions = 0
+        return self
+
+    def stats(self):
+        return dict(
+            hits=self.hits,
+            misses=self.misses,
+            evictions=self.evictions,
+            size=len(self.data),
+            maxsize=self.maxsize,
+        )
+
+
+# compiled validators are shared by every schema with the same fingerprint,
+# resize these caches to trade memory for fewer validator builds.
+validators = Lru(256)
+checkers = Lru(256)
+
+
+# compiled regular expressions shared by the pattern forms, the strings types and
+# the validators. re's own cache is small and is cleared wholesale when it fills.
+patterns = Lru(1024)
+
+# the canonical indexes of the enum lists the jsonschema validators check
+members = Lru(256)
+
+
+def regex(pattern, flags=0):
+    # the pattern compiled once, from the shared registry
+    k = pattern, flags
+    r = patterns.get(k)
+    if r is None:
+        r = patterns[k] = re.compile(pattern, flags)
+    return r
+
+
+# validation results of hashable immutable values, keyed by the schema fingerprint,
+# the type and the value. it is off until set_memoize, only successes are kept.
+results = Lru(4096)
+_memoize = [False]
+IMMUTABLE = {type(None), bool, int, float, str, bytes}
+
+
+def set_memoize(on=True):
+    # turning the memo off forgets what it remembered
+    _memoize[0] = bool(on)
+    if not on:
+        results.clear()
+
+
+def memoizing():
+    return _memoize[0]
+
+
+def canonical(x):
+    # a hashable key with json equality, 1 and 1.0 are equal but True and 1 are not.
+    if isinstance(x, bool):
+        return bool, x
+    if isinstance(x, (list, tuple)):
+        return list, tuple(map(canonical, x))
+    if isinstance(x, dict):
+        return dict, frozenset((k, canonical(v)) for k, v in x.items())
+    return x
+
+
+def unique(x):
+    # one hashing pass over the canonical keys, pairwise json equality when an
+    # element can't be hashed.
+    try:
+        return len(set(map(canonical, x))) == len(x)
+    except TypeError:
+        seen = []
+        for v in x:
+            if any(v == s for s in seen):
+                return False
+            seen.append(v)
+        return True
+
+
+def member(x, index, values):
+    # json equal membership in the canonical index of values, unhashable
+    # instances compare with each value.
+    try:
+        return canonical(x) in index
+    except TypeError:
+        return any(x == v for v in values)
+
+
+# validation backends compile a raveled schema into a predicate that is True for
+# valid instances. a backend returns None for schema it can't handle, and jsonschema
+# is used instead. failures are always explained by the jsonschema validator.
+backends = {}
+_default = ["compiled"]
+
+
+class _Local(threading.local):
+    # the part of contextvars.ContextVar we use, per thread, before python 3.7
+    def __init__(self, name, default=None):
+        self.name, self.value = name, default
+
+    def get(self):
+        return self.value
+
+    def set(self, value):
+        token, self.value = self.value, value
+        return token
+
+    def reset(self, token):
+        self.value = token
+
+
+try:
+    import contextvars
+except ImportError:  # pragma: no cover
+    _backend = _Local("backend")
+else:
+    _backend = contextvars.ContextVar("backend", default=None)
+
+
+def register_backend(name, factory=None):
+    if factory is None:
+        return functools.partial(register_backend, name)
+    backends[name] = factory
+    return factory
+
+
+def set_backend(name):
+    # choose the global validation backend
+    backends[name]
+    _default[0] = name
+
+
+@contextlib.contextmanager
+def backend(name):
+    # choose the validation backend within a context
+    backends[name]
+    token = _backend.set(name)
+    try:
+        yield name
+    finally:
+        _backend.reset(token)
+
+
+def get_backend():
+    return _backend.get() or _default[0]
+
+
+@functools.lru_cache(None)
+def _draft7():
+    # jsonschema sorts or compares items pairwise for uniqueItems, which is
+    # quadratic for the lists and dicts it can't sort. patterns come from the
+    # shared registry rather than re's cache.
+    import jsonschema
+
+    def unique_items(validator, value, instance, schema):
+        if value and validator.is_type(instance, "array") and not unique(instance):
+            yield jsonschema.ValidationError(f"{instance!r} has non-unique elements")
+
+    def enum(validator, value, instance, schema):
+        # the index is remembered with the list it was built from
+        m = members.get(id(value))
+        if m is None or m[0] is not value:
+            try:
+                m = value, frozenset(map(canonical, value))
+            except TypeError:
+                m = value, None
+            members[id(value)] = m
+        if m[1] is None:
+            yield from jsonschema.Draft7Validator.VALIDATORS["enum"](
+                validator, value, instance, schema
+            )
+        elif not member(instance, m[1], value):
+            yield jsonschema.ValidationError(f"{instance!r} is not one of {value!r}")
+
+    def pattern(validator, value, instance, schema):
+        if validator.is_type(instance, "string") and not regex(value).search(instance):
+            yield jsonschema.ValidationError(f"{instance!r} does not match {value!r}")
+
+    def pattern_properties(validator, value, instance, schema):
+        if not validator.is_type(instance, "object"):
+            return
+        for k, t in value.items():
+            r = regex(k)
+            for key, v in instance.items():
+                if r.search(key):
+                    yield from validator.descend(v, t, path=key, schema_path=k)
+
+    return jsonschema.validators.extend(
+        jsonschema.Draft7Validator,
+        dict(
+            enum=enum,
+            uniqueItems=unique_items,
+            pattern=pattern,
+            patternProperties=pattern_properties,
+        ),
+    )
+
+
+def draft7(schema):
+    from .formats import checker
+
+    return _draft7()(schema, format_checker=checker())
+
+
+@register_backend("jsonschema")
+def _jsonschema_backend(schema):
+    return draft7(schema).is_valid
+
+
+@register_backend("compiled")
+def _compiled_backend(schema):
+    from .compiler import compile
+
+    return compile(schema)
+
+
+def _fastjsonschema_backend(schema):
+    import fastjsonschema
+
+    f = fastjsonschema.compile(schema)
+
+    def is_valid(x):
+        try:
+            f(x)
+        except fastjsonschema.JsonSchemaException:
+            return False
+        return True
+
+    return is_valid
+
+
+def _jsonschema_rs_backend(schema):
+    import jsonschema_rs
+
+    return jsonschema_rs.Draft7Validator(schema).is_valid
+
+
+# the optional backends are only chosen when they can be imported
+for name, factory in (
+    ("fastjsonschema", _fastjsonschema_backend),
+    ("jsonschema_rs", _jsonschema_rs_backend),
+):
+    if importlib.util.find_spec(name):
+        register_backend(name, factory)
+del name, factory
+
+
+def shape(x):
+    # the structure of an unraveled schema as nested tuples. json values compare by
+    # value, types by their fingerprint, and anything else, like a computed
+    # default, by identity. ravel drops callables, these keep types that differ
+    # only by them apart.
+    if isinstance(x, type) and hasattr(type(x), "fingerprint"):
+        return "type", x.fingerprint()
+    if isinstance(x, (str, bytes, int, float, type(None))):
+        return type(x).__name__, x
+    if isinstance(x, dict):
+        return "dict", tuple(sorted((repr(k), shape(v)) for k, v in x.items()))
+    if isinstance(x, (tuple, list)):
+        return type(x).__name__, tuple(shape(v) for v in x)
+    if isinstance(x, (set, frozenset)):
+        return type(x).__name__, tuple(sorted(repr(shape(v)) for v in x))
+    if isinstance(x, typing.Pattern):
+        return "pattern", x.pattern, x.flags
+    return "id", id(x)
+
+
+def digest(x):
+    # the canonical fingerprint of a raveled schema
+    return hashlib.sha1(
+        json.dumps(x, sort_keys=True, default=repr).encode("utf-8")
+    ).hexdigest()
+
+
 class Schema(dict):
+    # the forms that merge as mappings or tuples, registered as the forms are defined
+    kinds = {}
+
     def __init__(self, object=None):
         if isinstance(object, type):
             object = getattr(object, "__annotations__", {})
@@ -134,46 +471,26 @@ class Schema(dict):
         super().__init__(object)
 
     def merge(*args):
-        from .base import Generic
-
-        next = {}
-
-        types = dict(
-            **{
-                x.form(): {}
-                for x in Generic.Mapping.__subclasses__()
-                if x is not Generic.Mapping
-            },
-            **{
-                x.form(): ()
-                for x in Generic.Plural.__subclasses__()
-                + Generic.Nested.__subclasses__()
-                if x is not (Generic.Plural, Generic.Nested)
-            },
-        )
+        # scalar forms take the value of the last argument, mapping forms update
+        # and plural forms append their values.
+        next = Schema({})
         for x in args:
-            for k, v in Schema(x).items():
-                if k in types:
-                    next.setdefault(k, types[k])
-                    if isinstance(types[k], dict):
-                        next[k].update(v)
-                    elif isinstance(next[k], tuple):
-                        for u in v:
-                            if isinstance(u, str):
-                                if u in next[k]:
-                                    continue
-                            next[k] += (u,)
+            if isinstance(x, type):
+                x = getattr(x, "__annotations__", {})
+            for k, v in x.items():
+                kind = Schema.kinds.get(k)
+                if kind is dict:
+                    next.setdefault(k, {}).update(v)
+                elif kind is tuple:
+                    next.setdefault(k, ())
+                    for u in v:
+                        if isinstance(u, str):
+                            if u in next[k]:
+                                continue
+                        next[k] += (u,)
                 else:
                     next[k] = v
-
-        for k in next:
-            if k in types:
-                v = next[k]
-                if isinstance(v, dict):
-                    o = sorted(v)
-                    v = dict(zip(o, map(v.get, o)))
-
-        return Schema(next)
+        return next
 
     def new(x, pointer=None):
         from .base import Generic
@@ -208,14 +525,70 @@ class Schema(dict):
                     t = t + types[k][v]
         return t
 
-    def validate(self, x):
-        import jsonschema
-
-        jsonschema.Draft7Validator(
-            self.ravel(), format_checker=jsonschema.draft7_format_checker
-        ).validate(x)
+    def fingerprint(self):
+        return digest(Schema.ravel(self))
+
+    def validator(self, key=None):
+        # key is the digest of the raveled schema when the caller has it already,
+        # a cached validator is then found without raveling.
+        k = key or digest(Schema.ravel(self))
+        v = validators.get(k)
+        if v is None:
+            v = validators[k] = draft7(Schema.ravel(self))
+        return v
+
+    def checker(self, backend=None, key=None):
+        # the predicate from the backend chosen by the argument, the type's backend
+        # form, the backend context, or the global default; in that order.
+        name = backend or self.get("backend") or get_backend()
+        k = name, key or digest(Schema.ravel(self))
+        f = checkers.get(k)
+        if f is None:
+            s = Schema.ravel(self)
+            f = checkers[k] = backends[name](s) or Schema.validator(s, k[1]).is_valid
+        return f
+
+    def validate(self, x, key=None):
+        # the backend is the fast path, jsonschema explains what went wrong.
+        if not Schema.checker(self, key=key)(x):
+            Schema.validator(self, key).validate(x)
         return x
 
+    def iter_errors(self, x):
+        # structured errors, from the compiled walk when the schema is supported.
+        from . import compiler, exceptions
+
+        s = Schema.ravel(self)
+        if compiler.supported(s):
+            return compiler.iter_errors(s, x)
+        return map(exceptions.Error.wrap, Schema.validator(s).iter_errors(x))
+
+    def compare(self, *instances, number=1):
+        """run every available backend on the same instances and report the time
+        spent and any disagreement with jsonschema."""
+        if not instances:
+            instances = (None, True, 0, 1.5, "", "a", [], [1, "a"], {}, {"a": 1})
+        expected = list(map(Schema.validator(self).is_valid, instances))
+        report = {}
+        for name in backends:
+            try:
+                f = backends[name](Schema.ravel(self))
+            except ImportError:
+                continue
+            if f is None:
+                report[name] = dict(supported=False)
+                continue
+            start = time.perf_counter()
+            for _ in range(number):
+                result = list(map(f, instances))
+            report[name] = dict(
+                supported=True,
+                seconds=time.perf_counter() - start,
+                agree=result == expected,
+                disagreements=[i for i, x in enumerate(result) if x != expected[i]],
+            )
+        return report
+
     def ravel(self):
         from .base import Generic
 